@@ -9,34 +9,27 @@ Prof. V. Ravichandran
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 import plotly.express as px
+import asyncio
 from datetime import datetime, timedelta
 
+from calc_graph import build_working_capital_graph
+from calculations import COST_OF_CAPITAL
+from charts import BRANDING, COLORS, FIGURE_TEMPLATE, compact
+from erp_connectors import ERPError, RestERPConnector
+from export import compute_result_sets, ipc_stream_bytes, parquet_bytes, to_arrow_table
+from forecasting import FORECAST_MODEL_PATH, WorkingCapitalForecaster, forecast_changes
+from inventory import DEFAULT_DIO_TARGET, load_sku_data, rollup_by_entity
+from panel import LOWER_IS_BETTER, analyze_panel, infer_freq, latest_trends
+from payables import DEFAULT_DPO_TARGET, PayablesOptimizer
+from portfolio import INPUT_COLUMNS, analyze_portfolio
+from portfolio_grid import PORTFOLIO_FORMATS, PortfolioGrid, style_portfolio_page
+from stress_testing import load_shock_library, replay_shocks
+
 # ============================================================================
-# BRANDING
+# CONFIGURATION
 # ============================================================================
 
-COLORS = {
-    'dark_blue': '#003366',
-    'medium_blue': '#004d80',
-    'accent_gold': '#FFD700',
-    'bg_dark': '#0a1628',
-    'card_bg': '#112240',
-    'text_primary': '#e6f1ff',
-    'text_secondary': '#8892b0',
-    'success': '#10b981',
-    'warning': '#f59e0b',
-    'danger': '#ef4444',
-}
-
-BRANDING = {
-    'name': 'The Mountain Path - World of Finance',
-    'instructor': 'Prof. V. Ravichandran',
-    'credentials': '28+ Years Corporate Finance & Banking | 10+ Years Academic Excellence',
-    'icon': '🏔️',
-}
-
 PAGE_CONFIG = {
     'page_title': 'Enhanced Working Capital AI Agent | Mountain Path',
     'page_icon': '🏔️',
@@ -44,6 +37,15 @@ PAGE_CONFIG = {
     'initial_sidebar_state': 'expanded',
 }
 
+# ============================================================================
+# CHART DISPLAY
+# ============================================================================
+
+def show_chart(fig):
+    """Render a figure with its own template (Streamlit's theme would re-inject its own)"""
+    st.plotly_chart(fig, use_container_width=True, theme=None)
+
+
 # ============================================================================
 # STYLING
 # ============================================================================
@@ -190,346 +192,180 @@ def metric_card(label, value, delta=None, delta_color=None):
 
 
 # ============================================================================
-# ADVANCED CALCULATIONS
+# CALCULATION GRAPH
 # ============================================================================
 
-def calculate_working_capital_metrics(revenue, cogs, cash, receivables, inventory, 
-                                     other_ca, payables, short_debt, other_cl):
-    """Calculate comprehensive working capital metrics"""
-    
-    total_ca = cash + receivables + inventory + other_ca
-    total_cl = payables + short_debt + other_cl
-    
-    net_wc = total_ca - total_cl
-    current_ratio = total_ca / total_cl if total_cl else 0
-    quick_ratio = (cash + receivables) / total_cl if total_cl else 0
-    cash_ratio = cash / total_cl if total_cl else 0
-    
-    # Operating cycle metrics
-    dso = (receivables / revenue) * 365 if revenue else 0
-    dio = (inventory / cogs) * 365 if cogs else 0
-    dpo = (payables / cogs) * 365 if cogs else 0
-    ccc = dso + dio - dpo
-    
-    # Efficiency ratios
-    receivables_turnover = revenue / receivables if receivables else 0
-    inventory_turnover = cogs / inventory if inventory else 0
-    payables_turnover = cogs / payables if payables else 0
-    
-    # Working capital ratios
-    wc_to_sales = net_wc / revenue if revenue else 0
-    wc_to_assets = net_wc / total_ca if total_ca else 0
-    
-    return {
-        'total_ca': total_ca,
-        'total_cl': total_cl,
-        'net_wc': net_wc,
-        'current_ratio': current_ratio,
-        'quick_ratio': quick_ratio,
-        'cash_ratio': cash_ratio,
-        'dso': dso,
-        'dio': dio,
-        'dpo': dpo,
-        'ccc': ccc,
-        'receivables_turnover': receivables_turnover,
-        'inventory_turnover': inventory_turnover,
-        'payables_turnover': payables_turnover,
-        'wc_to_sales': wc_to_sales,
-        'wc_to_assets': wc_to_assets,
-    }
-
-
-def generate_scenario_analysis(base_metrics, revenue, cogs):
-    """Generate best/worst case scenarios"""
-    
-    scenarios = {}
-    
-    # Base case
-    scenarios['Base'] = base_metrics
-    
-    # Best case: 20% improvement in collection, 15% in inventory efficiency
-    scenarios['Best'] = {
-        'dso': base_metrics['dso'] * 0.80,
-        'dio': base_metrics['dio'] * 0.85,
-        'dpo': base_metrics['dpo'] * 1.10,
-    }
-    scenarios['Best']['ccc'] = scenarios['Best']['dso'] + scenarios['Best']['dio'] - scenarios['Best']['dpo']
-    scenarios['Best']['impact'] = (base_metrics['ccc'] - scenarios['Best']['ccc']) / 365 * revenue * 0.08
-    
-    # Worst case: 20% deterioration
-    scenarios['Worst'] = {
-        'dso': base_metrics['dso'] * 1.20,
-        'dio': base_metrics['dio'] * 1.20,
-        'dpo': base_metrics['dpo'] * 0.90,
-    }
-    scenarios['Worst']['ccc'] = scenarios['Worst']['dso'] + scenarios['Worst']['dio'] - scenarios['Worst']['dpo']
-    scenarios['Worst']['impact'] = (scenarios['Worst']['ccc'] - base_metrics['ccc']) / 365 * revenue * 0.08
-    
-    return scenarios
+def session_graph():
+    """This browser session's calculation graph; node values persist across reruns"""
 
+    if 'calc_graph' not in st.session_state:
+        st.session_state['calc_graph'] = build_working_capital_graph(figures=True)
+    return st.session_state['calc_graph']
 
-def calculate_cash_flow_impact(metrics, revenue, cogs):
-    """Calculate cash flow impact of working capital changes"""
-    
-    # Calculate daily cash requirements
-    daily_revenue = revenue / 365
-    daily_cogs = cogs / 365
-    
-    # Cash tied up in operations
-    cash_in_receivables = metrics['dso'] * daily_revenue
-    cash_in_inventory = metrics['dio'] * daily_cogs
-    cash_from_payables = metrics['dpo'] * daily_cogs
-    
-    net_cash_tied = cash_in_receivables + cash_in_inventory - cash_from_payables
-    
-    # Free cash flow impact
-    operating_cash_flow = revenue * 0.15  # Assume 15% OCF margin
-    fcf_impact_pct = (net_cash_tied / operating_cash_flow) * 100
-    
-    return {
-        'cash_in_receivables': cash_in_receivables,
-        'cash_in_inventory': cash_in_inventory,
-        'cash_from_payables': cash_from_payables,
-        'net_cash_tied': net_cash_tied,
-        'fcf_impact_pct': fcf_impact_pct,
-    }
+
+# ============================================================================
+# ERP CONNECTOR
+# ============================================================================
+
+def pull_erp_entity(base_url, entity_id):
+    """Balances and revenue / COGS for one entity from an ERP REST endpoint"""
+
+    connector = RestERPConnector(base_url, concurrency=1, include_open_items=False)
+    portfolio, _, failed = asyncio.run(connector.fetch_entities([entity_id]))
+    if failed:
+        raise ERPError(f"entity {entity_id} could not be fetched from {base_url}")
+    return {key: int(round(value)) for key, value in portfolio.iloc[0][list(INPUT_COLUMNS)].items()}
 
 
 # ============================================================================
-# VISUALIZATION FUNCTIONS
+# LEARNED FORECAST
 # ============================================================================
 
-def create_ccc_waterfall(dso, dio, dpo):
-    """Create waterfall chart for Cash Conversion Cycle"""
-    
-    fig = go.Figure(go.Waterfall(
-        orientation="v",
-        measure=["relative", "relative", "relative", "total"],
-        x=["DSO", "DIO", "DPO", "CCC"],
-        y=[dso, dio, -dpo, None],
-        text=[f"{dso:.1f}", f"{dio:.1f}", f"-{dpo:.1f}", f"{dso+dio-dpo:.1f}"],
-        textposition="outside",
-        connector={"line": {"color": COLORS['text_secondary']}},
-        increasing={"marker": {"color": COLORS['danger']}},
-        decreasing={"marker": {"color": COLORS['success']}},
-        totals={"marker": {"color": COLORS['accent_gold']}},
-    ))
-    
-    fig.update_layout(
-        title="Cash Conversion Cycle Waterfall",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=COLORS['text_primary']),
-        showlegend=False,
-        height=400,
-    )
-    
-    return fig
+@st.cache_resource
+def load_persisted_forecaster():
+    """The forecaster saved under models/, or None"""
 
+    if FORECAST_MODEL_PATH.exists():
+        return WorkingCapitalForecaster.load(FORECAST_MODEL_PATH)
+    return None
 
-def create_trend_forecast(revenue, cogs, metrics, years=5):
-    """Create multi-year working capital forecast"""
-    
-    growth_scenarios = {
-        'Conservative': 0.05,
-        'Base': 0.10,
-        'Aggressive': 0.15,
-    }
-    
-    fig = go.Figure()
-    
-    for scenario, growth in growth_scenarios.items():
-        wc_values = []
-        years_list = []
-        
-        for year in range(years + 1):
-            rev = revenue * (1 + growth) ** year
-            rec = (metrics['dso'] / 365) * rev
-            inv = (metrics['dio'] / 365) * cogs * (1 + growth) ** year
-            pay = (metrics['dpo'] / 365) * cogs * (1 + growth) ** year
-            wc = rec + inv - pay
-            
-            wc_values.append(wc)
-            years_list.append(f"Year {year}")
-        
-        fig.add_trace(go.Scatter(
-            x=years_list,
-            y=wc_values,
-            mode='lines+markers',
-            name=f"{scenario} ({growth*100:.0f}%)",
-            line=dict(width=3),
-        ))
-    
-    fig.update_layout(
-        title="Working Capital Forecast (5-Year)",
-        xaxis_title="Year",
-        yaxis_title="Working Capital (₹)",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=COLORS['text_primary']),
-        hovermode='x unified',
-        height=450,
-    )
-    
-    return fig
 
+@st.cache_resource
+def train_forecaster(history):
+    """Train a forecaster on the uploaded history"""
+    return WorkingCapitalForecaster().fit(history)
 
-def create_sensitivity_analysis(base_ccc, revenue):
-    """Create sensitivity analysis heatmap"""
-    
-    dso_range = np.linspace(-30, 30, 7)
-    dio_range = np.linspace(-30, 30, 7)
-    
-    impact_matrix = []
-    
-    for dio_change in dio_range:
-        row = []
-        for dso_change in dso_range:
-            ccc_change = dso_change + dio_change
-            cash_impact = (ccc_change / 365) * revenue * 0.08
-            row.append(cash_impact / 1_000_000)  # In millions
-        impact_matrix.append(row)
-    
-    fig = go.Figure(data=go.Heatmap(
-        z=impact_matrix,
-        x=[f"{x:+.0f}" for x in dso_range],
-        y=[f"{y:+.0f}" for y in dio_range],
-        colorscale='RdYlGn_r',
-        text=np.round(impact_matrix, 1),
-        texttemplate='%{text}M',
-        textfont={"size": 10},
-        colorbar=dict(title="Cash Impact (₹M)"),
-    ))
-    
-    fig.update_layout(
-        title="Sensitivity Analysis: DSO vs DIO Impact on Cash",
-        xaxis_title="DSO Change (days)",
-        yaxis_title="DIO Change (days)",
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=COLORS['text_primary']),
-        height=450,
-    )
-    
-    return fig
 
+def load_forecaster(history):
+    """The persisted forecaster if it covers the uploaded history, else one trained on it"""
 
-def create_benchmark_comparison(metrics):
-    """Create benchmark comparison radar chart"""
-    
-    # Industry benchmarks (example values)
-    categories = ['Current Ratio', 'Quick Ratio', 'DSO Efficiency', 'DIO Efficiency', 'CCC Efficiency']
-    
-    # Normalize metrics to 0-100 scale
-    current_values = [
-        min(metrics['current_ratio'] / 2.0 * 100, 100),  # Target: 2.0
-        min(metrics['quick_ratio'] / 1.5 * 100, 100),    # Target: 1.5
-        min(60 / max(metrics['dso'], 1) * 100, 100),     # Target: 60 days
-        min(45 / max(metrics['dio'], 1) * 100, 100),     # Target: 45 days
-        min(90 / max(abs(metrics['ccc']), 1) * 100, 100) if metrics['ccc'] > 0 else 100,
-    ]
-    
-    industry_avg = [70, 65, 60, 55, 50]  # Example industry averages
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatterpolar(
-        r=current_values,
-        theta=categories,
-        fill='toself',
-        name='Current',
-        line=dict(color=COLORS['accent_gold'], width=2),
-    ))
-    
-    fig.add_trace(go.Scatterpolar(
-        r=industry_avg,
-        theta=categories,
-        fill='toself',
-        name='Industry Avg',
-        line=dict(color=COLORS['text_secondary'], width=2),
-        opacity=0.6,
-    ))
-    
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                gridcolor=COLORS['text_secondary'],
-            ),
-            bgcolor='rgba(0,0,0,0)',
-        ),
-        showlegend=True,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=COLORS['text_primary']),
-        height=450,
+    forecaster = load_persisted_forecaster()
+    if forecaster is not None and forecaster.covers(history):
+        return forecaster
+    return train_forecaster(history)
+
+
+def learned_days_forecast(history, entity_id):
+    """Quarterly DSO/DIO/DPO changes forecast for one entity, or None if unavailable
+
+    Changes are relative to the entity's last quarter in the history; the
+    graph applies them to the days shown on the dashboard.
+    """
+
+    try:
+        forecaster = load_forecaster(history)
+        entity_history = history[history['entity_id'] == entity_id]
+        forecast = forecast_changes(forecaster.predict(entity_history), entity_history)
+    except (KeyError, ValueError) as exc:
+        st.sidebar.warning(f"Learned forecast unavailable: {exc}")
+        return None
+
+    return forecast.reset_index(drop=True)
+
+
+@st.cache_data
+def load_sku_policy(sku_file, demand_file, service_level):
+    """SKU policy (EOQ, safety stock, target value) from uploaded SKU data"""
+
+    _, policy = load_sku_data(sku_file, demand_file, service_level=service_level)
+    return policy
+
+
+def sku_inventory_target(policy, entity_id, inventory, cogs):
+    """Achievable DIO and cash release for the selected entity's SKUs"""
+
+    policy = policy[policy['entity_id'] == entity_id]
+    if policy.empty:
+        raise ValueError(f"no SKUs for entity {entity_id}")
+    rollup = rollup_by_entity(
+        policy,
+        inventory=pd.Series({entity_id: inventory}),
+        cogs=pd.Series({entity_id: cogs}),
     )
-    
-    return fig
+    return rollup.iloc[0]
+
+
+@st.cache_resource
+def load_payables_optimizer(ap_file):
+    """Parse uploaded AP invoices once; re-optimizing per rate is then cheap"""
+    return PayablesOptimizer(pd.read_csv(ap_file))
 
 
 # ============================================================================
-# INSIGHT GENERATION
+# PORTFOLIO GRID
 # ============================================================================
 
-def generate_insights(metrics, cash_flow_impact, scenarios):
-    """Generate AI-powered insights"""
-    
-    insights = []
-    
-    # Liquidity insights
-    if metrics['current_ratio'] < 1.0:
-        insights.append({
-            'type': 'danger',
-            'title': 'Critical Liquidity Risk',
-            'message': f"Current ratio of {metrics['current_ratio']:.2f} indicates potential inability to meet short-term obligations. Immediate action required."
-        })
-    elif metrics['current_ratio'] < 1.5:
-        insights.append({
-            'type': 'warning',
-            'title': 'Liquidity Concern',
-            'message': f"Current ratio of {metrics['current_ratio']:.2f} is below healthy threshold of 1.5. Consider strengthening liquidity position."
-        })
+@st.cache_resource
+def load_portfolio_grid(portfolio_file):
+    """Read an uploaded portfolio and keep its computed results as a typed grid"""
+
+    if portfolio_file.name.endswith('.parquet'):
+        portfolio = pd.read_parquet(portfolio_file)
     else:
-        insights.append({
-            'type': 'success',
-            'title': 'Strong Liquidity',
-            'message': f"Current ratio of {metrics['current_ratio']:.2f} indicates healthy liquidity position."
-        })
-    
-    # CCC insights
-    if metrics['ccc'] < 0:
-        insights.append({
-            'type': 'success',
-            'title': 'Negative CCC - Cash Advantage',
-            'message': f"Negative CCC of {metrics['ccc']:.1f} days means suppliers are financing operations. Excellent working capital management."
-        })
-    elif metrics['ccc'] > 90:
-        insights.append({
-            'type': 'warning',
-            'title': 'Extended CCC',
-            'message': f"CCC of {metrics['ccc']:.1f} days is high. Consider improving collection (DSO: {metrics['dso']:.1f}d) or inventory efficiency (DIO: {metrics['dio']:.1f}d)."
-        })
-    
-    # Cash flow insights
-    if cash_flow_impact['fcf_impact_pct'] > 50:
-        insights.append({
-            'type': 'warning',
-            'title': 'Significant Cash Tied in Working Capital',
-            'message': f"{cash_flow_impact['fcf_impact_pct']:.1f}% of operating cash flow is tied in working capital. Optimization could release ₹{cash_flow_impact['net_cash_tied']/1_000_000:.1f}M."
-        })
-    
-    # Improvement potential
-    improvement_potential = scenarios['Best']['impact']
-    if improvement_potential > 1_000_000:
-        insights.append({
-            'type': 'info',
-            'title': 'Optimization Opportunity',
-            'message': f"Optimizing CCC could release up to ₹{improvement_potential/1_000_000:.1f}M in cash (Best case scenario)."
-        })
-    
-    return insights
+        portfolio = pd.read_csv(portfolio_file)
+    if 'entity_id' not in portfolio:
+        portfolio.insert(0, 'entity_id', np.arange(len(portfolio)))
+
+    return PortfolioGrid(analyze_portfolio(portfolio))
+
+
+# ============================================================================
+# PANEL TRENDS
+# ============================================================================
+
+@st.cache_data
+def read_panel(panel_file):
+    """Uploaded panel history and the frequency its period spacing implies ('M', 'Q' or None)"""
+
+    history = pd.read_csv(panel_file)
+    return history, infer_freq(history)
+
+
+@st.cache_data
+def load_panel(history, freq):
+    """Average-balance ratios and period-over-period deltas for an uploaded history"""
+    return analyze_panel(history, freq=freq)
+
+
+def trend_delta(trends, metric, basis='yoy'):
+    """(delta %, color) for a metric card from panel trends, or (None, None)"""
+
+    if trends is None:
+        return None, None
+    delta = trends.get(f"{metric}_{basis}_pct")
+    if delta is None or pd.isna(delta):
+        return None, None
+
+    improving = delta < 0 if metric in LOWER_IS_BETTER else delta > 0
+    return delta, COLORS['success'] if improving else COLORS['danger']
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+EXPORT_FORMATS = {
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', parquet_bytes),
+    'Arrow IPC stream': ('arrows', 'application/vnd.apache.arrow.stream', ipc_stream_bytes),
+}
+
+
+def export_downloads(tables, key):
+    """Download buttons for Arrow tables in the chosen columnar format"""
+
+    fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_format")
+    extension, mime, to_bytes = EXPORT_FORMATS[fmt]
+
+    cols = st.columns(len(tables))
+    for col, (name, table) in zip(cols, tables.items()):
+        with col:
+            st.download_button(
+                f"{name.replace('_', ' ').title()} ({table.num_rows:,} rows)",
+                data=to_bytes(table),
+                file_name=f"{name}.{extension}",
+                mime=mime,
+                key=f"{key}_{name}",
+            )
 
 
 # ============================================================================
@@ -552,42 +388,165 @@ def main():
     # ================= SIDEBAR =================
 
     with st.sidebar:
+        with st.expander("🔌 ERP Connector"):
+            erp_url = st.text_input("ERP Base URL", value="http://127.0.0.1:8765",
+                                    help="REST endpoint serving /entities/{id}/balances and /financials (see mock_erp.py)")
+            erp_entity = st.number_input("ERP Entity ID", min_value=0, value=0, step=1)
+            if st.button("Pull from ERP"):
+                try:
+                    st.session_state['erp_inputs'] = pull_erp_entity(erp_url, int(erp_entity))
+                    st.success(f"Loaded entity {int(erp_entity)}")
+                except ERPError as exc:
+                    st.warning(f"ERP pull failed: {exc}")
+
+        st.markdown("### 🗓️ Panel History")
+        panel_file = st.file_uploader(
+            "Balances & flows per entity and period (CSV)", type="csv",
+            help="Columns: entity_id, period, revenue, cogs (per period), cash, receivables, inventory, other_ca, payables, short_debt, other_cl",
+        )
+        trends = None
+        use_panel_cycle = False
+        if panel_file is not None:
+            panel_history, detected_freq = read_panel(panel_file)
+            panel_freq = st.radio("Frequency", ['M', 'Q'], index=['M', 'Q'].index(detected_freq or 'M'),
+                                  horizontal=True, format_func={'M': 'Monthly', 'Q': 'Quarterly'}.get,
+                                  help="Detected from the spacing of the uploaded periods")
+            panel = load_panel(panel_history, panel_freq)
+            if panel['ccc'].isna().all():
+                st.warning("No period has a full trailing year of history at this frequency, so the panel "
+                           "ratios are empty. Check the frequency matches the uploaded periods.")
+            panel_entity = st.selectbox("Panel Entity", panel['entity_id'].unique())
+            trends = latest_trends(panel, panel_entity)
+            use_panel_cycle = st.checkbox(
+                "DSO/DIO/DPO from panel average balances", value=False,
+                help="Replaces the sidebar-based DSO/DIO/DPO with trailing-twelve-month average-balance days; "
+                     "edits to receivables, inventory, payables, revenue and COGS then no longer move them",
+            )
+
+        # Latest panel period or an ERP pull pre-fills the inputs (TTM flows, closing balances)
+        defaults = {
+            'revenue': 20_000_000, 'cogs': 14_000_000, 'cash': 2_000_000, 'receivables': 5_000_000,
+            'inventory': 3_000_000, 'other_ca': 500_000, 'payables': 3_500_000,
+            'short_debt': 1_500_000, 'other_cl': 400_000,
+        }
+        if trends is not None:
+            latest = {**trends, 'revenue': trends['ttm_revenue'], 'cogs': trends['ttm_cogs']}
+            defaults.update({key: int(round(latest[key])) for key in defaults if pd.notna(latest[key])})
+        # Values pulled from the ERP take precedence over the uploaded panel
+        defaults.update(st.session_state.get('erp_inputs', {}))
+
         st.markdown("### 🧾 Income Statement Inputs")
-        revenue = st.number_input("Annual Revenue (₹)", value=20_000_000, step=1_000_000)
-        cogs = st.number_input("Annual COGS (₹)", value=14_000_000, step=1_000_000)
+        revenue = st.number_input("Annual Revenue (₹)", value=defaults['revenue'], step=1_000_000)
+        cogs = st.number_input("Annual COGS (₹)", value=defaults['cogs'], step=1_000_000)
 
         st.markdown("### 💰 Current Assets")
-        cash = st.number_input("Cash (₹)", value=2_000_000, step=100_000)
-        receivables = st.number_input("Accounts Receivable (₹)", value=5_000_000, step=100_000)
-        inventory = st.number_input("Inventory (₹)", value=3_000_000, step=100_000)
-        other_ca = st.number_input("Other Current Assets (₹)", value=500_000, step=50_000)
+        cash = st.number_input("Cash (₹)", value=defaults['cash'], step=100_000)
+        receivables = st.number_input("Accounts Receivable (₹)", value=defaults['receivables'], step=100_000)
+        inventory = st.number_input("Inventory (₹)", value=defaults['inventory'], step=100_000)
+        other_ca = st.number_input("Other Current Assets (₹)", value=defaults['other_ca'], step=50_000)
 
         st.markdown("### 💳 Current Liabilities")
-        payables = st.number_input("Accounts Payable (₹)", value=3_500_000, step=100_000)
-        short_debt = st.number_input("Short-Term Debt (₹)", value=1_500_000, step=100_000)
-        other_cl = st.number_input("Other Current Liabilities (₹)", value=400_000, step=50_000)
+        payables = st.number_input("Accounts Payable (₹)", value=defaults['payables'], step=100_000)
+        short_debt = st.number_input("Short-Term Debt (₹)", value=defaults['short_debt'], step=100_000)
+        other_cl = st.number_input("Other Current Liabilities (₹)", value=defaults['other_cl'], step=50_000)
+
+        st.markdown("### 📐 Assumptions")
+        cost_of_capital = st.number_input(
+            "Cost of Capital (%)", value=COST_OF_CAPITAL * 100, step=0.5,
+            help="Used for scenario and sensitivity cash impacts, stress financing costs and the AP early-pay decision",
+        ) / 100
+
+        st.markdown("### 🤖 Learned Forecast")
+        history_file = st.file_uploader(
+            "Quarterly DSO/DIO/DPO history (CSV)", type="csv",
+            help="Columns: entity_id, period, segment, revenue, dso, dio, dpo",
+        )
+        history = pd.read_csv(history_file) if history_file is not None else None
+        entity_id = None
+        if history is not None:
+            entity_id = st.selectbox("Entity", sorted(history['entity_id'].unique()))
+
+        st.markdown("### 📦 SKU Inventory Data")
+        sku_file = st.file_uploader(
+            "SKU master (CSV)", type="csv",
+            help="Columns: sku_id, unit_cost, lead_time_days; optional lead_time_std_days, order_cost, holding_rate, service_level",
+        )
+        demand_file = st.file_uploader(
+            "Monthly SKU demand history (CSV)", type="csv",
+            help="Columns: sku_id, period, demand",
+        )
+        service_level = st.slider("Target Service Level", 0.80, 0.995, 0.95, step=0.005)
+        sku_policy, sku_entity = None, None
+        if sku_file is not None and demand_file is not None:
+            try:
+                sku_policy = load_sku_policy(sku_file, demand_file, service_level)
+            except (KeyError, ValueError) as exc:
+                st.warning(f"SKU optimization unavailable: {exc}")
+            else:
+                sku_entities = sorted(sku_policy['entity_id'].unique())
+                sku_entity = sku_entities[0]
+                if len(sku_entities) > 1:
+                    sku_entity = st.selectbox("SKU Entity", sku_entities,
+                                              help="Entity whose SKUs back the inventory recommendation")
+
+        st.markdown("### 🧾 AP Invoices")
+        ap_file = st.file_uploader(
+            "Open / paid AP invoices (CSV)", type="csv",
+            help="Columns: supplier_id, amount, terms (e.g. '2/10 net 30'); optional paid_days",
+        )
 
     # ================= CALCULATIONS =================
 
-    metrics = calculate_working_capital_metrics(
-        revenue, cogs, cash, receivables, inventory, 
-        other_ca, payables, short_debt, other_cl
+    days_forecast = None
+    if history is not None:
+        days_forecast = learned_days_forecast(history, entity_id)
+
+    # Panel mode (opt-in): operating cycle uses average balances over the trailing year
+    cycle_override = None
+    if use_panel_cycle and trends is not None:
+        if pd.notna(trends['ccc']):
+            cycle_override = {key: trends[key] for key in ('dso', 'dio', 'dpo')}
+        else:
+            st.sidebar.warning("Panel average-balance days need a full trailing year of history; using the sidebar inputs.")
+
+    # Only nodes downstream of a changed input are recomputed on this rerun
+    graph = session_graph()
+    graph.update(
+        revenue=revenue, cogs=cogs, cash=cash, receivables=receivables, inventory=inventory,
+        other_ca=other_ca, payables=payables, short_debt=short_debt, other_cl=other_cl,
+        cost_of_capital=cost_of_capital, cycle_override=cycle_override, days_forecast=days_forecast,
     )
-    
-    scenarios = generate_scenario_analysis(metrics, revenue, cogs)
-    cash_flow_impact = calculate_cash_flow_impact(metrics, revenue, cogs)
-    insights = generate_insights(metrics, cash_flow_impact, scenarios)
+
+    metrics = graph.get('metrics')
+    scenarios = graph.get('scenarios')
+    cash_flow_impact = graph.get('cash_flow')
+    insights = graph.get('insights')
+
+    payables_plan = None
+    if ap_file is not None:
+        try:
+            payables_plan = load_payables_optimizer(ap_file).summary(cost_of_capital)
+        except (KeyError, ValueError) as exc:
+            st.sidebar.warning(f"AP optimization unavailable: {exc}")
+
+    inventory_target = None
+    if sku_policy is not None:
+        try:
+            inventory_target = sku_inventory_target(sku_policy, sku_entity, inventory, cogs)
+        except (KeyError, ValueError) as exc:
+            st.sidebar.warning(f"SKU optimization unavailable: {exc}")
 
     # ================= TABS =================
 
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "📊 Dashboard",
         "📈 Liquidity Analysis",
         "🔄 Operating Cycle",
         "💡 AI Insights",
         "📉 Scenario Analysis",
         "🎯 Sensitivity Analysis",
-        "📊 Benchmarking"
+        "📊 Benchmarking",
+        "🗂️ Portfolio"
     ])
 
     # -------- DASHBOARD --------
@@ -597,14 +556,17 @@ def main():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            metric_card("Net Working Capital", f"₹{metrics['net_wc']/1_000_000:.1f}M")
+            metric_card("Net Working Capital", f"₹{metrics['net_wc']/1_000_000:.1f}M", *trend_delta(trends, 'net_wc'))
         with col2:
-            metric_card("Current Ratio", f"{metrics['current_ratio']:.2f}")
+            metric_card("Current Ratio", f"{metrics['current_ratio']:.2f}", *trend_delta(trends, 'current_ratio'))
         with col3:
-            metric_card("Cash Conversion Cycle", f"{metrics['ccc']:.0f} days")
+            metric_card("Cash Conversion Cycle", f"{metrics['ccc']:.0f} days", *trend_delta(trends, 'ccc'))
         with col4:
             metric_card("Cash Tied Up", f"₹{cash_flow_impact['net_cash_tied']/1_000_000:.1f}M")
 
+        if trends is not None:
+            st.caption(f"Arrows show change vs the same period last year for {trends['entity_id']} ({trends['period']}); panel DSO/DIO/DPO use average balances over the trailing twelve months.")
+
         st.markdown("<br>", unsafe_allow_html=True)
 
         col1, col2 = st.columns(2)
@@ -613,38 +575,42 @@ def main():
             st.markdown("#### Current Assets vs Liabilities")
             comparison_df = pd.DataFrame({
                 'Category': ['Current Assets', 'Current Liabilities'],
-                'Amount': [metrics['total_ca'], metrics['total_cl']]
+                'Amount': compact([metrics['total_ca'], metrics['total_cl']], 0)
             })
             fig = px.bar(comparison_df, x='Category', y='Amount', 
                         color='Category',
                         color_discrete_map={'Current Assets': COLORS['success'], 
-                                          'Current Liabilities': COLORS['danger']})
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=COLORS['text_primary']),
-                showlegend=False,
-                height=350,
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                                          'Current Liabilities': COLORS['danger']},
+                        template=FIGURE_TEMPLATE)
+            fig.update_layout(showlegend=False, height=350)
+            show_chart(fig)
         
         with col2:
             st.markdown("#### Working Capital Composition")
             composition_df = pd.DataFrame({
                 'Component': ['Receivables', 'Inventory', 'Cash', 'Other CA', 'Payables', 'ST Debt', 'Other CL'],
-                'Amount': [receivables, inventory, cash, other_ca, -payables, -short_debt, -other_cl],
+                'Amount': compact([receivables, inventory, cash, other_ca, -payables, -short_debt, -other_cl], 0),
                 'Type': ['Asset', 'Asset', 'Asset', 'Asset', 'Liability', 'Liability', 'Liability']
             })
             fig = px.bar(composition_df, x='Component', y='Amount', color='Type',
                         color_discrete_map={'Asset': COLORS['accent_gold'], 
-                                          'Liability': COLORS['danger']})
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=COLORS['text_primary']),
-                height=350,
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                                          'Liability': COLORS['danger']},
+                        template=FIGURE_TEMPLATE)
+            fig.update_layout(height=350)
+            show_chart(fig)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        with st.expander("📤 Export Results"):
+            company = pd.DataFrame([{
+                'entity_id': 0, 'revenue': revenue, 'cogs': cogs, 'cash': cash, 'receivables': receivables,
+                'inventory': inventory, 'other_ca': other_ca, 'payables': payables,
+                'short_debt': short_debt, 'other_cl': other_cl, 'cost_of_capital': cost_of_capital,
+            }])
+            tables = compute_result_sets(company)
+            if days_forecast is not None:
+                tables['forecast'] = to_arrow_table(graph.get('days_path'), 'forecast')
+            export_downloads(tables, key="company_export")
 
     # -------- LIQUIDITY ANALYSIS --------
     with tab2:
@@ -652,15 +618,25 @@ def main():
         
         col1, col2, col3 = st.columns(3)
         
-        with col1:
-            metric_card("Current Ratio", f"{metrics['current_ratio']:.2f}", 
-                       delta=((metrics['current_ratio'] - 2.0) / 2.0 * 100))
-        with col2:
-            metric_card("Quick Ratio", f"{metrics['quick_ratio']:.2f}",
-                       delta=((metrics['quick_ratio'] - 1.5) / 1.5 * 100))
-        with col3:
-            metric_card("Cash Ratio", f"{metrics['cash_ratio']:.2f}",
-                       delta=((metrics['cash_ratio'] - 0.5) / 0.5 * 100))
+        if trends is not None:
+            # Panel mode: real year-over-year trends
+            with col1:
+                metric_card("Current Ratio", f"{metrics['current_ratio']:.2f}", *trend_delta(trends, 'current_ratio'))
+            with col2:
+                metric_card("Quick Ratio", f"{metrics['quick_ratio']:.2f}", *trend_delta(trends, 'quick_ratio'))
+            with col3:
+                metric_card("Cash Ratio", f"{metrics['cash_ratio']:.2f}", *trend_delta(trends, 'cash_ratio'))
+        else:
+            # Distance from target ratios (2.0 / 1.5 / 0.5)
+            with col1:
+                metric_card("Current Ratio", f"{metrics['current_ratio']:.2f}", 
+                           delta=((metrics['current_ratio'] - 2.0) / 2.0 * 100))
+            with col2:
+                metric_card("Quick Ratio", f"{metrics['quick_ratio']:.2f}",
+                           delta=((metrics['quick_ratio'] - 1.5) / 1.5 * 100))
+            with col3:
+                metric_card("Cash Ratio", f"{metrics['cash_ratio']:.2f}",
+                           delta=((metrics['cash_ratio'] - 0.5) / 0.5 * 100))
 
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -670,28 +646,25 @@ def main():
             st.markdown("#### Detailed Balance Sheet")
             balance_sheet = pd.DataFrame({
                 'Current Assets': ['Cash', 'Receivables', 'Inventory', 'Other CA', 'Total CA'],
-                'Amount (₹)': [f"{cash:,.0f}", f"{receivables:,.0f}", f"{inventory:,.0f}", 
-                             f"{other_ca:,.0f}", f"{metrics['total_ca']:,.0f}"],
-                '% of Total': [f"{cash/metrics['total_ca']*100:.1f}%", 
-                             f"{receivables/metrics['total_ca']*100:.1f}%",
-                             f"{inventory/metrics['total_ca']*100:.1f}%",
-                             f"{other_ca/metrics['total_ca']*100:.1f}%",
-                             "100.0%"]
+                'Amount (₹)': [cash, receivables, inventory, other_ca, metrics['total_ca']],
             })
-            st.dataframe(balance_sheet, use_container_width=True, hide_index=True)
+            balance_sheet['% of Total'] = balance_sheet['Amount (₹)'] / metrics['total_ca'] * 100
+            st.dataframe(balance_sheet.style.format({
+                'Amount (₹)': '{:,.0f}',
+                '% of Total': '{:.1f}%',
+            }), use_container_width=True, hide_index=True)
         
         with col2:
             st.markdown("#### Current Liabilities Breakdown")
             liabilities = pd.DataFrame({
                 'Current Liabilities': ['Payables', 'Short-Term Debt', 'Other CL', 'Total CL'],
-                'Amount (₹)': [f"{payables:,.0f}", f"{short_debt:,.0f}", 
-                             f"{other_cl:,.0f}", f"{metrics['total_cl']:,.0f}"],
-                '% of Total': [f"{payables/metrics['total_cl']*100:.1f}%",
-                             f"{short_debt/metrics['total_cl']*100:.1f}%",
-                             f"{other_cl/metrics['total_cl']*100:.1f}%",
-                             "100.0%"]
+                'Amount (₹)': [payables, short_debt, other_cl, metrics['total_cl']],
             })
-            st.dataframe(liabilities, use_container_width=True, hide_index=True)
+            liabilities['% of Total'] = liabilities['Amount (₹)'] / metrics['total_cl'] * 100
+            st.dataframe(liabilities.style.format({
+                'Amount (₹)': '{:,.0f}',
+                '% of Total': '{:.1f}%',
+            }), use_container_width=True, hide_index=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -706,17 +679,22 @@ def main():
     # -------- OPERATING CYCLE --------
     with tab3:
         st.markdown("### Operating Cycle & Cash Conversion")
+
+        if cycle_override is not None:
+            st.info(f"DSO/DIO/DPO are {trends['entity_id']}'s average-balance days from the uploaded panel, "
+                    "so sidebar edits to receivables, inventory, payables, revenue and COGS do not change them. "
+                    "Untick \"DSO/DIO/DPO from panel average balances\" in the sidebar to use the sidebar inputs.")
         
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            metric_card("DSO", f"{metrics['dso']:.0f} days")
+            metric_card("DSO", f"{metrics['dso']:.0f} days", *trend_delta(trends, 'dso'))
         with col2:
-            metric_card("DIO", f"{metrics['dio']:.0f} days")
+            metric_card("DIO", f"{metrics['dio']:.0f} days", *trend_delta(trends, 'dio'))
         with col3:
-            metric_card("DPO", f"{metrics['dpo']:.0f} days")
+            metric_card("DPO", f"{metrics['dpo']:.0f} days", *trend_delta(trends, 'dpo'))
         with col4:
-            metric_card("CCC", f"{metrics['ccc']:.0f} days")
+            metric_card("CCC", f"{metrics['ccc']:.0f} days", *trend_delta(trends, 'ccc'))
 
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -724,52 +702,51 @@ def main():
         
         with col1:
             st.markdown("#### Cash Conversion Cycle Waterfall")
-            fig = create_ccc_waterfall(metrics['dso'], metrics['dio'], metrics['dpo'])
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(graph.get('fig_waterfall'))
         
         with col2:
             st.markdown("#### Turnover Ratios")
             turnover_df = pd.DataFrame({
                 'Metric': ['Receivables Turnover', 'Inventory Turnover', 'Payables Turnover'],
                 'Times per Year': [
-                    f"{metrics['receivables_turnover']:.2f}x",
-                    f"{metrics['inventory_turnover']:.2f}x",
-                    f"{metrics['payables_turnover']:.2f}x"
+                    metrics['receivables_turnover'],
+                    metrics['inventory_turnover'],
+                    metrics['payables_turnover'],
                 ],
-                'Days': [
-                    f"{metrics['dso']:.0f}",
-                    f"{metrics['dio']:.0f}",
-                    f"{metrics['dpo']:.0f}"
-                ]
+                'Days': [metrics['dso'], metrics['dio'], metrics['dpo']],
             })
-            st.dataframe(turnover_df, use_container_width=True, hide_index=True)
+            st.dataframe(turnover_df.style.format({
+                'Times per Year': '{:.2f}x',
+                'Days': '{:.0f}',
+            }), use_container_width=True, hide_index=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
 
+        if days_forecast is not None:
+            st.markdown("#### Learned DSO / DIO / DPO Forecast")
+            show_chart(graph.get('fig_days_forecast'))
+
+            st.markdown("<br>", unsafe_allow_html=True)
+
         # Cash Flow Impact
         st.markdown("#### Cash Flow Impact Analysis")
         
         impact_data = pd.DataFrame({
             'Component': ['Cash in Receivables', 'Cash in Inventory', 'Cash from Payables', 'Net Cash Tied'],
-            'Amount (₹M)': [
+            'Amount (₹M)': compact([
                 cash_flow_impact['cash_in_receivables'] / 1_000_000,
                 cash_flow_impact['cash_in_inventory'] / 1_000_000,
                 -cash_flow_impact['cash_from_payables'] / 1_000_000,
                 cash_flow_impact['net_cash_tied'] / 1_000_000
-            ]
+            ], 2)
         })
         
         fig = px.bar(impact_data, x='Component', y='Amount (₹M)', 
                     color='Amount (₹M)',
-                    color_continuous_scale=['red', 'yellow', 'green'])
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=COLORS['text_primary']),
-            showlegend=False,
-            height=350,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+                    color_continuous_scale=['red', 'yellow', 'green'],
+                    template=FIGURE_TEMPLATE)
+        fig.update_layout(showlegend=False, height=350)
+        show_chart(fig)
 
     # -------- AI INSIGHTS --------
     with tab4:
@@ -797,15 +774,30 @@ def main():
             cash_release = (days_reduction / 365) * revenue
             recommendations.append(f"**Accelerate Collections**: Reduce DSO from {metrics['dso']:.0f} to 60 days → Release ₹{cash_release/1_000_000:.1f}M cash")
         
-        if metrics['dio'] > 45:
-            days_reduction = metrics['dio'] - 45
+        if inventory_target is not None:
+            dio_target = inventory_target['achievable_dio']
+            dio_basis = f"SKU-optimized at {service_level:.1%} service level"
+        else:
+            dio_target = DEFAULT_DIO_TARGET
+            dio_basis = "industry average; upload SKU data for an optimized target"
+
+        if metrics['dio'] > dio_target:
+            days_reduction = metrics['dio'] - dio_target
             cash_release = (days_reduction / 365) * cogs
-            recommendations.append(f"**Optimize Inventory**: Reduce DIO from {metrics['dio']:.0f} to 45 days → Release ₹{cash_release/1_000_000:.1f}M cash")
+            recommendations.append(f"**Optimize Inventory**: Reduce DIO from {metrics['dio']:.0f} to {dio_target:.0f} days ({dio_basis}) → Release ₹{cash_release/1_000_000:.1f}M cash")
         
-        if metrics['dpo'] < 45:
-            days_increase = 45 - metrics['dpo']
+        if payables_plan is not None:
+            recommendations.append(
+                f"**Optimize Supplier Payments**: At a {cost_of_capital:.1%} cost of capital, pay "
+                f"{payables_plan['share_paid_early']:.0%} of AP spend early for discounts and stretch the rest to the due date "
+                f"→ DPO {payables_plan['current_dpo']:.0f} → {payables_plan['optimal_dpo']:.0f} days, "
+                f"payables cash effect ₹{payables_plan['payables_cash_effect']/1_000_000:+.1f}M, "
+                f"net discount benefit ₹{payables_plan['net_benefit']/1_000_000:.1f}M"
+            )
+        elif metrics['dpo'] < DEFAULT_DPO_TARGET:
+            days_increase = DEFAULT_DPO_TARGET - metrics['dpo']
             cash_benefit = (days_increase / 365) * cogs
-            recommendations.append(f"**Negotiate Payment Terms**: Increase DPO from {metrics['dpo']:.0f} to 45 days → Free up ₹{cash_benefit/1_000_000:.1f}M cash")
+            recommendations.append(f"**Negotiate Payment Terms**: Increase DPO from {metrics['dpo']:.0f} to {DEFAULT_DPO_TARGET} days (industry average; upload AP invoices for an optimized schedule) → Free up ₹{cash_benefit/1_000_000:.1f}M cash")
         
         if metrics['current_ratio'] < 1.5:
             recommendations.append(f"**Strengthen Liquidity**: Target current ratio of 1.5-2.0 (currently {metrics['current_ratio']:.2f})")
@@ -820,8 +812,7 @@ def main():
 
         # 5-Year Forecast
         st.markdown("### 📈 Working Capital Forecast")
-        fig = create_trend_forecast(revenue, cogs, metrics)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(graph.get('fig_forecast'))
 
     # -------- SCENARIO ANALYSIS --------
     with tab5:
@@ -854,25 +845,21 @@ def main():
         scenario_df = pd.DataFrame({
             'Scenario': ['Best', 'Base', 'Worst'] * 3,
             'Metric': ['DSO'] * 3 + ['DIO'] * 3 + ['CCC'] * 3,
-            'Days': [
+            'Days': compact([
                 scenarios['Best']['dso'], metrics['dso'], scenarios['Worst']['dso'],
                 scenarios['Best']['dio'], metrics['dio'], scenarios['Worst']['dio'],
                 scenarios['Best']['ccc'], metrics['ccc'], scenarios['Worst']['ccc']
-            ]
+            ], 1)
         })
         
         fig = px.bar(scenario_df, x='Metric', y='Days', color='Scenario',
                     barmode='group',
                     color_discrete_map={'Best': COLORS['success'], 
                                        'Base': COLORS['accent_gold'],
-                                       'Worst': COLORS['danger']})
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=COLORS['text_primary']),
-            height=400,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+                                       'Worst': COLORS['danger']},
+                    template=FIGURE_TEMPLATE)
+        fig.update_layout(height=400)
+        show_chart(fig)
 
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -898,7 +885,7 @@ def main():
                                   int(metrics['dpo']))
         
         custom_ccc = custom_dso + custom_dio - custom_dpo
-        custom_impact = (metrics['ccc'] - custom_ccc) / 365 * revenue * 0.08
+        custom_impact = (metrics['ccc'] - custom_ccc) / 365 * revenue * cost_of_capital
         
         col1, col2 = st.columns(2)
         with col1:
@@ -906,22 +893,75 @@ def main():
         with col2:
             metric_card("Cash Impact", f"₹{custom_impact/1_000_000:.1f}M")
 
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # Historical stress replay
+        st.markdown("### 🌪️ Historical Stress Replay")
+
+        company = pd.DataFrame([{
+            'revenue': revenue, 'cogs': cogs, 'cash': cash, 'receivables': receivables,
+            'inventory': inventory, 'other_ca': other_ca, 'payables': payables,
+            'short_debt': short_debt, 'other_cl': other_cl, 'cost_of_capital': cost_of_capital,
+        }])
+        library = load_shock_library()
+        replay = replay_shocks(company, library)
+
+        stress_df = pd.DataFrame({
+            'Shock': replay['shock'],
+            'Description': [library[name]['description'] for name in replay['shock']],
+            'Peak Cash Requirement (₹M)': replay['peak_requirement'] / 1_000_000,
+            'Peak Quarter': replay['peak_period'],
+            'First Liquidity Breach': [
+                f"Q{q}" if pd.notna(q) else "None" for q in replay['first_breach_period']
+            ],
+        })
+
+        st.dataframe(stress_df.style.format({
+            'Peak Cash Requirement (₹M)': '{:.2f}',
+        }), use_container_width=True, hide_index=True)
+        st.info(f"A breach is the first quarter in which the shock's cumulative cash requirement exceeds current cash of ₹{cash/1_000_000:.1f}M.")
+
     # -------- SENSITIVITY ANALYSIS --------
     with tab6:
         st.markdown("### DSO vs DIO Sensitivity Matrix")
-        fig = create_sensitivity_analysis(metrics['ccc'], revenue)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(graph.get('fig_sensitivity'))
 
         st.markdown("<br>", unsafe_allow_html=True)
 
         st.markdown("### Key Sensitivity Insights")
         st.info("The heatmap shows cash impact (in millions) from simultaneous changes in DSO and DIO. Green indicates cash release, red indicates cash requirement.")
 
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        st.markdown("### 🌪️ Input Elasticities")
+
+        tornado_outputs = {
+            'ccc': 'Cash Conversion Cycle (days)',
+            'net_cash_tied': 'Net Cash Tied (₹)',
+            'best_impact': 'Best-Case Cash Impact (₹)',
+            'fcf_impact_pct': 'Cash Tied as % of OCF',
+            'current_ratio': 'Current Ratio',
+            'net_wc': 'Net Working Capital (₹)',
+        }
+        tornado_output = st.selectbox("Output", list(tornado_outputs), format_func=tornado_outputs.get)
+
+        graph.set('tornado_output', tornado_output)
+        graph.set('tornado_label', tornado_outputs[tornado_output])
+        tornado = graph.get('tornado')
+        show_chart(graph.get('fig_tornado'))
+        if cycle_override is not None:
+            st.caption("DSO, DIO and DPO are the panel's average-balance days, so they do not move with the sidebar balances.")
+
+        st.dataframe(tornado.iloc[::-1][['label', 'value', 'derivative', 'elasticity']].rename(columns={
+            'label': 'Input', 'value': 'Value', 'derivative': '∂ Output / ∂ Input', 'elasticity': 'Elasticity',
+        }).style.format({'Value': '{:,.2f}', '∂ Output / ∂ Input': '{:,.4g}', 'Elasticity': '{:.3f}'}),
+            use_container_width=True, hide_index=True)
+        st.info("Elasticity is the % change in the output for a 1% change in the input, computed exactly from the model's formulas.")
+
     # -------- BENCHMARKING --------
     with tab7:
         st.markdown("### Performance vs Industry Benchmarks")
-        fig = create_benchmark_comparison(metrics)
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(graph.get('fig_benchmark'))
 
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -930,18 +970,83 @@ def main():
         benchmark_df = pd.DataFrame({
             'Metric': ['Current Ratio', 'Quick Ratio', 'DSO', 'DIO', 'DPO', 'CCC'],
             'Your Company': [
-                f"{metrics['current_ratio']:.2f}",
-                f"{metrics['quick_ratio']:.2f}",
-                f"{metrics['dso']:.0f}",
-                f"{metrics['dio']:.0f}",
-                f"{metrics['dpo']:.0f}",
-                f"{metrics['ccc']:.0f}"
+                metrics['current_ratio'],
+                metrics['quick_ratio'],
+                metrics['dso'],
+                metrics['dio'],
+                metrics['dpo'],
+                metrics['ccc'],
             ],
-            'Industry Average': ['2.00', '1.50', '60', '45', '45', '60'],
-            'Best in Class': ['2.50', '2.00', '45', '30', '60', '15']
+            'Industry Average': [2.00, 1.50, 60, 45, 45, 60],
+            'Best in Class': [2.50, 2.00, 45, 30, 60, 15]
         })
         
-        st.dataframe(benchmark_df, use_container_width=True, hide_index=True)
+        value_cols = ['Your Company', 'Industry Average', 'Best in Class']
+        st.dataframe(benchmark_df.style
+                     .format('{:.2f}', subset=pd.IndexSlice[[0, 1], value_cols])
+                     .format('{:.0f}', subset=pd.IndexSlice[[2, 3, 4, 5], value_cols]),
+                     use_container_width=True, hide_index=True)
+
+    # -------- PORTFOLIO --------
+    with tab8:
+        st.markdown("### Portfolio Working Capital Grid")
+
+        portfolio_file = st.file_uploader(
+            "Portfolio (CSV or Parquet)", type=["csv", "parquet"],
+            help="One row per entity with revenue, cogs, cash, receivables, inventory, other_ca, payables, short_debt, other_cl; optional entity_id and segment",
+        )
+
+        if portfolio_file is None:
+            st.info("Upload a portfolio file to analyze every entity. Sorting, filtering and paging run on the server, so only the visible page is sent to the browser.")
+        else:
+            grid = load_portfolio_grid(portfolio_file)
+            sortable = [col for col in PORTFOLIO_FORMATS if col in grid.frame]
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                sort_by = st.selectbox("Sort by", sortable, index=sortable.index('ccc'))
+            with col2:
+                ascending = st.toggle("Ascending", value=False)
+            with col3:
+                search = st.text_input("Entity search")
+            with col4:
+                page_size = st.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+
+            categories = {}
+            if 'segment' in grid.frame:
+                categories['segment'] = st.multiselect("Segments", sorted(grid.frame['segment'].dropna().unique()))
+
+            ccc_min, ccc_max = float(grid.frame['ccc'].min()), float(grid.frame['ccc'].max())
+            ccc_range = st.slider("CCC range (days)", ccc_min, max(ccc_max, ccc_min + 1), (ccc_min, max(ccc_max, ccc_min + 1)))
+            filters = dict(ranges={'ccc': ccc_range}, categories=categories, search=search)
+
+            _, total, pages = grid.query(sort_by, ascending, page=0, page_size=page_size, **filters)
+            page_number = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1)
+            page, total, pages = grid.query(sort_by, ascending, page=page_number - 1, page_size=page_size, **filters)
+
+            start = (page_number - 1) * page_size
+            st.caption(f"Showing {start + 1 if total else 0:,}–{start + len(page):,} of {total:,} matching entities ({len(grid.frame):,} total)")
+            st.dataframe(style_portfolio_page(page), use_container_width=True, hide_index=True)
+
+            st.markdown("#### 📤 Export Portfolio Results")
+            export_key = f"portfolio_export_{portfolio_file.name}"
+            if st.button("Prepare export"):
+                portfolio_inputs = grid.frame[[col for col in grid.frame if col in ('entity_id', 'segment') or col in INPUT_COLUMNS]]
+                st.session_state[export_key] = {
+                    'portfolio': to_arrow_table(grid.frame, 'portfolio'),
+                    **compute_result_sets(portfolio_inputs, ['stress', 'sensitivity_grid']),
+                }
+            if export_key in st.session_state:
+                export_downloads(st.session_state[export_key], key="portfolio_export")
+
+    # ================= RECOMPUTE STATS =================
+
+    with st.sidebar.expander("⚙️ Recompute Stats"):
+        stats = graph.stats().sort_values(['this_interaction', 'total'], ascending=False)
+        st.caption(f"This interaction recomputed {len(graph.recomputed)} of {len(stats)} calculation nodes.")
+        st.dataframe(stats.rename(columns={
+            'node': 'Node', 'this_interaction': 'This Interaction', 'total': 'Total',
+        }), use_container_width=True, hide_index=True)
 
     # ================= FOOTER =================
     
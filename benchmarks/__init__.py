@@ -0,0 +1 @@
+"""Offline benchmarks for the portfolio-scale analytics modules."""
@@ -0,0 +1,47 @@
+"""
+Benchmark a batch what-if session on the calculation graph against a full
+recompute of every derived quantity per edit.
+
+    python -m benchmarks.bench_calc_graph --entities 500000 --field other_cl --edits 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import generate_portfolio
+from calc_graph import what_if_session
+from portfolio import analyze_portfolio, calculate_sensitivity_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=500_000)
+    parser.add_argument('--field', default='other_cl')
+    parser.add_argument('--edits', type=int, default=20)
+    args = parser.parse_args()
+
+    portfolio = generate_portfolio(args.entities)
+    factors = np.linspace(0.5, 1.5, args.edits)
+    edits = [lambda column, factor=factor: column * factor for factor in factors]
+
+    start = time.perf_counter()
+    results, stats = what_if_session(portfolio, args.field, edits)
+    t_graph = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for factor in factors:
+        edited = portfolio.assign(**{args.field: portfolio[args.field] * factor})
+        analyze_portfolio(edited)
+        calculate_sensitivity_grid(edited['revenue'])
+    t_full = time.perf_counter() - start
+
+    print(f"{args.entities:,} entities, {args.edits} edits of {args.field}")
+    print(f"graph session:    {t_graph:.2f}s ({len(results):,} result rows)")
+    print(f"full recompute:   {t_full:.2f}s")
+    print(f"nodes per edit:   {stats['recomputed'].iloc[-1]} ({stats['nodes'].iloc[-1]})")
+
+
+if __name__ == '__main__':
+    main()
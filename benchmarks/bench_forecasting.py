@@ -0,0 +1,46 @@
+"""
+Benchmark the learned DSO/DIO/DPO forecaster on a held-out window.
+
+    python -m benchmarks.bench_forecasting --entities 50000 --periods 40 --save
+
+Prints MAE per metric and horizon next to the flat-extrapolation baseline,
+plus fit / batch-inference latency. With --save the fitted model is written
+to models/wc_forecaster.joblib, where app.py picks it up.
+"""
+
+import argparse
+import time
+
+from synthetic import generate_history
+from forecasting import FORECAST_MODEL_PATH, evaluate_forecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=10_000)
+    parser.add_argument('--periods', type=int, default=40)
+    parser.add_argument('--horizon', type=int, default=8)
+    parser.add_argument('--save', action='store_true')
+    args = parser.parse_args()
+
+    history = generate_history(args.entities, args.periods)
+    forecaster, accuracy, latency = evaluate_forecaster(history, horizon=args.horizon)
+
+    print(accuracy.pivot(index='horizon', columns='metric', values=['mae', 'flat_mae']).round(2))
+    print(f"\nentities:          {latency['entities']:,}")
+    print(f"fit:               {latency['fit_seconds']:.2f}s")
+    print(f"batch predict:     {latency['predict_seconds']:.3f}s "
+          f"({latency['entities_per_second']:,.0f} entities/s)")
+
+    start = time.perf_counter()
+    forecaster.retrain(history, extra_iter=25)
+    print(f"warm-start retrain: {time.perf_counter() - start:.2f}s")
+
+    if args.save:
+        FORECAST_MODEL_PATH.parent.mkdir(exist_ok=True)
+        forecaster.save(FORECAST_MODEL_PATH)
+        print(f"saved to {FORECAST_MODEL_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the SKU inventory engine for linear scaling up to 5M SKUs.
+
+    python -m benchmarks.bench_inventory --skus 500000 1000000 5000000
+
+Demand history is streamed one period at a time, as it would be from a
+chunked file read.
+"""
+
+import argparse
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from inventory import accumulate_demand, optimize_inventory, rollup_by_entity
+
+
+def generate_skus(n_skus, n_entities, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'entity_id': rng.integers(0, n_entities, size=n_skus),
+        'sku_id': np.arange(n_skus),
+        'unit_cost': rng.lognormal(np.log(200), 1.0, size=n_skus),
+        'lead_time_days': rng.integers(3, 60, size=n_skus).astype(float),
+        'lead_time_std_days': rng.uniform(0, 5, size=n_skus),
+        'on_hand': rng.lognormal(np.log(150), 0.8, size=n_skus),
+    })
+
+
+def demand_chunks(n_skus, n_periods, seed=42):
+    rng = np.random.default_rng(seed)
+    base = rng.lognormal(np.log(100), 0.7, size=n_skus)
+    sku_id = np.arange(n_skus)
+    for _ in range(n_periods):
+        yield pd.DataFrame({'sku_id': sku_id, 'demand': rng.poisson(base).astype(float)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skus', type=int, nargs='+', default=[500_000, 1_000_000, 2_000_000, 5_000_000])
+    parser.add_argument('--periods', type=int, default=12)
+    parser.add_argument('--entities', type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{'SKUs':>12} {'demand':>8} {'policy':>8} {'rollup':>8} {'total':>8} {'us/SKU':>8} {'peak RSS':>10}")
+    for n_skus in args.skus:
+        skus = generate_skus(n_skus, args.entities)
+
+        start = time.perf_counter()
+        stats = accumulate_demand(skus['sku_id'], demand_chunks(n_skus, args.periods))
+        t_demand = time.perf_counter()
+        policy = optimize_inventory(skus, stats)
+        t_policy = time.perf_counter()
+        rollup_by_entity(policy)
+        t_rollup = time.perf_counter()
+
+        total = t_rollup - start
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{n_skus:>12,} {t_demand - start:>7.2f}s {t_policy - t_demand:>7.2f}s "
+              f"{t_rollup - t_policy:>7.2f}s {total:>7.2f}s {total / n_skus * 1e6:>8.2f} {rss_mb:>8.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark panel analysis on 10 years of monthly history.
+
+    python -m benchmarks.bench_panel --entities 50000 --years 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from panel import BALANCE_COLUMNS, analyze_panel
+
+
+def generate_panel(n_entities, n_periods, seed=42):
+    rng = np.random.default_rng(seed)
+    n = n_entities * n_periods
+    scale = np.repeat(rng.lognormal(np.log(2_000_000), 1.0, size=n_entities), n_periods)
+    frame = pd.DataFrame({
+        'entity_id': np.repeat(np.arange(n_entities), n_periods),
+        'period': np.tile(np.arange(n_periods), n_entities),
+        'revenue': scale * rng.uniform(0.9, 1.1, size=n),
+    })
+    frame['cogs'] = frame['revenue'] * 0.7
+    for col in BALANCE_COLUMNS:
+        frame[col] = scale * rng.uniform(0.5, 3.0, size=n)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=50_000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--freq', choices=['M', 'Q'], default='M')
+    args = parser.parse_args()
+
+    periods = args.years * (12 if args.freq == 'M' else 4)
+    history = generate_panel(args.entities, periods)
+
+    start = time.perf_counter()
+    result = analyze_panel(history, freq=args.freq)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(history):,} rows ({args.entities:,} entities x {periods} periods), "
+          f"{result.shape[1]} output columns: {elapsed:.2f}s ({len(history) / elapsed / 1e6:.1f}M rows/s)")
+
+
+if __name__ == '__main__':
+    main()
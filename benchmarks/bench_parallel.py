@@ -0,0 +1,78 @@
+"""
+Scaling benchmark for the shared-memory parallel layer (1-32 workers).
+
+Each job is run single-process first (the fallback) and then with every
+worker count; every parallel result is checked to be identical to it.
+
+    python -m benchmarks.bench_parallel --entities 1000000 --workers 1 2 4 8 16 32
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_history, generate_portfolio
+from forecasting import WorkingCapitalForecaster
+from parallel import (
+    parallel_analyze_portfolio, parallel_predict, parallel_replay_shocks,
+    parallel_sensitivities, parallel_sensitivity_grid,
+)
+
+
+def _identical(a, b):
+    if isinstance(a, pd.DataFrame):
+        return a.equals(b)
+    if isinstance(a, dict):
+        return all(_identical(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return a == b
+    return np.array_equal(a, b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=1_000_000)
+    parser.add_argument('--sensitivity-entities', type=int, default=100_000,
+                        help="elasticities hold an (N x outputs x inputs) cube, so they use a smaller portfolio")
+    parser.add_argument('--history-entities', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--jobs', nargs='+', default=['portfolio', 'grid', 'stress', 'sensitivities', 'forecast'])
+    args = parser.parse_args()
+
+    portfolio = generate_portfolio(args.entities)
+    jobs = {
+        'portfolio': lambda w: parallel_analyze_portfolio(portfolio, workers=w),
+        'grid': lambda w: parallel_sensitivity_grid(portfolio['revenue'], workers=w),
+        'stress': lambda w: parallel_replay_shocks(portfolio, workers=w),
+        'sensitivities': lambda w: parallel_sensitivities(portfolio.iloc[:args.sensitivity_entities], workers=w),
+    }
+    if 'forecast' in args.jobs:
+        history = generate_history(args.history_entities, n_periods=12)
+        forecaster = WorkingCapitalForecaster(max_iter=50).fit(history.iloc[:20_000 * 12])
+        jobs['forecast'] = lambda w: parallel_predict(forecaster, history, workers=w)
+
+    print(f"{os.cpu_count()} CPU(s) available")
+    print(f"{'job':<14} {'workers':>7} {'seconds':>8} {'speedup':>8} {'efficiency':>10} {'identical':>9}")
+    for name in args.jobs:
+        start = time.perf_counter()
+        reference = jobs[name](1)
+        baseline = time.perf_counter() - start
+        print(f"{name:<14} {'fallback':>7} {baseline:>8.2f} {1.0:>8.2f} {1.0:>10.0%} {'-':>9}")
+
+        for workers in args.workers:
+            if workers == 1:
+                continue
+            start = time.perf_counter()
+            result = jobs[name](workers)
+            elapsed = time.perf_counter() - start
+            speedup = baseline / elapsed
+            print(f"{name:<14} {workers:>7} {elapsed:>8.2f} {speedup:>8.2f} {speedup / workers:>10.0%} "
+                  f"{str(_identical(reference, result)):>9}")
+            del result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark the AP payment optimizer on tens of millions of invoice lines.
+
+    python -m benchmarks.bench_payables --invoices 20000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from payables import PayablesOptimizer
+
+TERMS = ['2/10 net 30', '1/10 net 30', '1/15 net 45', '2/10 net 60', 'net 30', 'net 45', '0.5/10 net 30']
+
+
+def generate_invoices(n_invoices, n_suppliers=50_000, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'supplier_id': rng.integers(0, n_suppliers, size=n_invoices),
+        'amount': rng.lognormal(np.log(25_000), 1.0, size=n_invoices),
+        'terms': pd.Categorical.from_codes(rng.integers(0, len(TERMS), size=n_invoices), TERMS),
+        'paid_days': rng.uniform(15, 50, size=n_invoices),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--invoices', type=int, default=20_000_000)
+    args = parser.parse_args()
+
+    invoices = generate_invoices(args.invoices)
+
+    start = time.perf_counter()
+    optimizer = PayablesOptimizer(invoices)
+    t_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    print(optimizer.summary(0.08))
+    t_summary = time.perf_counter() - start
+
+    start = time.perf_counter()
+    curve = optimizer.summary(np.linspace(0.0, 0.60, 1_000))
+    t_curve = time.perf_counter() - start
+
+    start = time.perf_counter()
+    optimizer.schedule(0.08)
+    t_schedule = time.perf_counter() - start
+
+    start = time.perf_counter()
+    optimizer.by_supplier(0.08)
+    t_supplier = time.perf_counter() - start
+
+    print(f"\n{args.invoices:,} invoices")
+    print(f"build (parse, rates, sort): {t_build:.2f}s")
+    print(f"re-optimize, 1 rate:        {t_summary * 1e3:.2f}ms")
+    print(f"re-optimize, {len(curve):,} rates:    {t_curve * 1e3:.2f}ms")
+    print(f"full payment schedule:      {t_schedule:.2f}s")
+    print(f"per-supplier rollup:        {t_supplier:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
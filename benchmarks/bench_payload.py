@@ -0,0 +1,47 @@
+"""
+Per-tab Plotly payload sent to the browser on one run of the dashboard.
+
+Runs app.py headless with Streamlit's AppTest and sums the serialized figure
+specs in every tab. Point --app at another checkout to compare before/after.
+
+    python -m benchmarks.bench_payload
+    python -m benchmarks.bench_payload --app /tmp/baseline/app.py
+"""
+
+import argparse
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = Path(__file__).resolve().parent.parent / 'app.py'
+
+
+def tab_payloads(app_path):
+    """{tab label: (charts, bytes)} for one default run of the app"""
+
+    at = AppTest.from_file(str(app_path), default_timeout=300).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    payloads = {}
+    for tab in at.tabs:
+        charts = [element.proto for element in tab.get('plotly_chart')]
+        payloads[tab.label] = (len(charts), sum(len(chart.spec.encode()) + len(chart.config.encode())
+                                                for chart in charts))
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', type=Path, default=APP)
+    args = parser.parse_args()
+
+    payloads = tab_payloads(args.app)
+    print(f"{'tab':<28} {'charts':>6} {'bytes':>9}")
+    for label, (charts, size) in payloads.items():
+        print(f"{label:<28} {charts:>6} {size:>9,}")
+    print(f"{'total':<28} {sum(c for c, _ in payloads.values()):>6} {sum(s for _, s in payloads.values()):>9,}")
+
+
+if __name__ == '__main__':
+    main()
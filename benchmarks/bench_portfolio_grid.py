@@ -0,0 +1,39 @@
+"""
+Show that the portfolio grid's per-page payload and query latency stay flat
+as the entity count grows.
+
+    python -m benchmarks.bench_portfolio_grid --entities 1000 10000 50000 200000
+"""
+
+import argparse
+import time
+
+from synthetic import generate_portfolio
+from portfolio import analyze_portfolio
+from portfolio_grid import PortfolioGrid, style_portfolio_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, nargs='+', default=[1_000, 10_000, 50_000, 200_000])
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'entities':>10} {'analyze':>9} {'query':>9} {'page payload':>14} {'full-table payload':>20}")
+    for n in args.entities:
+        start = time.perf_counter()
+        grid = PortfolioGrid(analyze_portfolio(generate_portfolio(n)))
+        t_analyze = time.perf_counter() - start
+
+        grid.query('ccc', False, page_size=args.page_size)  # warm the sort cache
+        start = time.perf_counter()
+        page, _, _ = grid.query('ccc', False, page=5, page_size=args.page_size, ranges={'ccc': (0, 150)})
+        t_query = time.perf_counter() - start
+
+        page_bytes = len(style_portfolio_page(page).to_html())
+        full_bytes = len(grid.frame.to_json(orient='split'))
+        print(f"{n:>10,} {t_analyze:>8.2f}s {t_query * 1e3:>7.1f}ms {page_bytes / 1024:>12.0f}KB {full_bytes / 1024:>18,.0f}KB")
+
+
+if __name__ == '__main__':
+    main()
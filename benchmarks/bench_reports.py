@@ -0,0 +1,32 @@
+"""
+Benchmark month-end CFO report generation for thousands of entities.
+
+    python -m benchmarks.bench_reports --entities 5000 --workers 1 2 4 8
+"""
+
+import argparse
+import tempfile
+
+from synthetic import generate_portfolio
+from reports import generate_reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=5_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=50)
+    args = parser.parse_args()
+
+    portfolio = generate_portfolio(args.entities)
+
+    print(f"{'workers':>7} {'seconds':>8} {'reports/s':>10} {'p50 ms':>7} {'p95 ms':>7} {'max ms':>7}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as out_dir:
+            stats = generate_reports(portfolio, out_dir, workers=workers, chunk_size=args.chunk_size)
+        print(f"{workers:>7} {stats['seconds']:>8.2f} {stats['reports_per_second']:>10.1f} "
+              f"{stats['latency_p50_ms']:>7.1f} {stats['latency_p95_ms']:>7.1f} {stats['latency_max_ms']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
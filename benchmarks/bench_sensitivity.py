@@ -0,0 +1,37 @@
+"""
+Benchmark the one-pass Jacobian for a whole portfolio.
+
+    python -m benchmarks.bench_sensitivity --entities 50000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import generate_portfolio
+from sensitivity import compute_sensitivities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=50_000)
+    args = parser.parse_args()
+
+    portfolio = generate_portfolio(args.entities)
+
+    start = time.perf_counter()
+    result = compute_sensitivities(portfolio)
+    elapsed = time.perf_counter() - start
+
+    n, n_outputs, n_inputs = result['derivatives'].shape
+    print(f"{n:,} entities x {n_outputs} outputs x {n_inputs} inputs: {elapsed:.2f}s")
+
+    ccc = result['outputs'].index('ccc')
+    median = np.median(np.abs(result['elasticities'][:, ccc]), axis=0)
+    for name, value in sorted(zip(result['inputs'], median), key=lambda item: -item[1]):
+        print(f"  median |elasticity| of CCC to {name:<16} {value:.3f}")
+
+
+if __name__ == '__main__':
+    main()
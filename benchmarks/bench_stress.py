@@ -0,0 +1,34 @@
+"""
+Benchmark the historical stress replay over the full shock library.
+
+    python -m benchmarks.bench_stress --entities 50000
+"""
+
+import argparse
+import time
+
+from synthetic import generate_portfolio
+from stress_testing import load_shock_library, replay_shocks, summarize_replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=50_000)
+    parser.add_argument('--shocks', nargs='*', default=(), help="extra shock files or directories")
+    args = parser.parse_args()
+
+    portfolio = generate_portfolio(args.entities)
+    library = load_shock_library(*args.shocks)
+
+    start = time.perf_counter()
+    results = replay_shocks(portfolio, library)
+    elapsed = time.perf_counter() - start
+
+    print(summarize_replay(results))
+    cells = args.entities * len(library) * max(len(s['dso']) for s in library.values())
+    print(f"\n{args.entities:,} entities x {len(library)} shocks: {elapsed:.2f}s "
+          f"({cells / elapsed / 1e6:,.1f}M entity-shock-periods/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Calculation Dependency Graph
+
+The dashboard's derived quantities (metrics, scenarios, cash-flow impact,
+insights and each figure) as an explicit graph of memoized nodes over the
+shared formulas in calculations.py. Changing an input only recomputes the
+nodes downstream of it: editing other_cl reruns the metrics, but the
+operating cycle they contain is unchanged, so scenarios, cash flow, the
+forecast and the sensitivity grid are not rerun.
+
+Nodes are validated lazily by revision: a node is recomputed only when one
+of its dependencies changed since it was last verified, and a node that
+recomputes to the same value does not invalidate its own dependants.
+
+The calculation nodes are elementwise, so the same graph runs a single
+company (scalar inputs) or a batch what-if session over many entities
+(array inputs); see what_if_session.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculations import (
+    COST_OF_CAPITAL, OCF_MARGIN, calculate_cash_flow_impact, calculate_working_capital_metrics,
+    generate_insights, generate_scenario_analysis,
+)
+from charts import (
+    create_benchmark_comparison, create_ccc_waterfall, create_days_forecast, create_sensitivity_analysis,
+    create_tornado_chart, create_trend_forecast,
+)
+from forecasting import quarterly_to_annual_days, rebase_forecast
+from portfolio import INPUT_COLUMNS, calculate_sensitivity_grid
+from sensitivity import SENSITIVITY_INPUTS, compute_sensitivities, sensitivity_table
+
+
+def _same(a, b):
+    """Value equality for the types nodes produce; unknown objects count as changed"""
+
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray):
+        try:
+            return a.shape == b.shape and np.array_equal(a, b, equal_nan=a.dtype.kind in 'fc')
+        except TypeError:
+            return False
+    if isinstance(a, (pd.DataFrame, pd.Series)):
+        return a.equals(b)
+    if isinstance(a, (int, float, str, bool, np.number)):
+        return a == b or (a != a and b != b)  # NaN == NaN here
+    return False
+
+
+class CalcGraph:
+    """Memoized dependency graph of inputs and computed nodes"""
+
+    def __init__(self):
+        self._nodes = {}         # name -> (func, deps)
+        self._values = {}
+        self._changed_at = {}    # revision at which the value last changed
+        self._verified_at = {}   # revision at which a node was last known up to date
+        self.revision = 0
+        self.counts = {}         # name -> total recomputes
+        self.recomputed = []     # nodes recomputed in the current interaction
+
+    # ------------------------------------------------------------------
+    # Definition
+    # ------------------------------------------------------------------
+
+    def add_input(self, name, value=None):
+        self._values[name] = value
+        self._changed_at[name] = self.revision
+        return self
+
+    def add_node(self, name, func, deps):
+        unknown = [dep for dep in deps if dep not in self._values and dep not in self._nodes]
+        if unknown:
+            raise KeyError(f"{name} depends on undefined nodes: {', '.join(unknown)}")
+        self._nodes[name] = (func, tuple(deps))
+        self.counts[name] = 0
+        return self
+
+    @property
+    def inputs(self):
+        return [name for name in self._values if name not in self._nodes]
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+    def downstream(self, name):
+        """Every node that (transitively) depends on `name`"""
+
+        found, frontier = set(), {name}
+        while frontier:
+            frontier = {node for node, (_, deps) in self._nodes.items()
+                        if node not in found and frontier.intersection(deps)}
+            found |= frontier
+        return [node for node in self._nodes if node in found]
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def set(self, name, value):
+        """Set an input; returns True if its value changed"""
+
+        if name in self._nodes or name not in self._values:
+            raise KeyError(f"{name!r} is not an input")
+        if _same(self._values[name], value):
+            return False
+        self.revision += 1
+        self._values[name] = value
+        self._changed_at[name] = self.revision
+        return True
+
+    def update(self, **values):
+        """Start a new interaction: set inputs and return the names that changed"""
+
+        self.recomputed = []
+        return [name for name, value in values.items() if self.set(name, value)]
+
+    def get(self, name):
+        if name not in self._nodes:
+            return self._values[name]
+        if self._verified_at.get(name) == self.revision:
+            return self._values[name]
+
+        func, deps = self._nodes[name]
+        args = [self.get(dep) for dep in deps]
+
+        if name in self._values and all(self._changed_at[dep] <= self._verified_at[name] for dep in deps):
+            self._verified_at[name] = self.revision
+            return self._values[name]
+
+        value = func(*args)
+        self.counts[name] += 1
+        self.recomputed.append(name)
+
+        # Early cutoff: an unchanged result leaves dependants valid
+        if name not in self._values or not _same(self._values[name], value):
+            self._values[name] = value
+            self._changed_at[name] = self.revision
+        self._verified_at[name] = self.revision
+        return self._values[name]
+
+    def stats(self):
+        """Recompute counts per node: this interaction and in total"""
+
+        this_interaction = pd.Series(self.recomputed, dtype=object).value_counts()
+        return pd.DataFrame({
+            'node': self.nodes,
+            'this_interaction': [int(this_interaction.get(node, 0)) for node in self.nodes],
+            'total': [self.counts[node] for node in self.nodes],
+        })
+
+
+# ============================================================================
+# WORKING CAPITAL GRAPH
+# ============================================================================
+
+CYCLE_KEYS = ('dso', 'dio', 'dpo', 'ccc')
+
+
+def _metrics(*values):
+    """calculate_working_capital_metrics, with DSO/DIO/DPO optionally overridden"""
+
+    *inputs, override = values
+    metrics = calculate_working_capital_metrics(*inputs)
+    if override is not None:
+        metrics.update({key: override[key] for key in ('dso', 'dio', 'dpo')})
+        metrics['ccc'] = metrics['dso'] + metrics['dio'] - metrics['dpo']
+    return metrics
+
+
+def _sensitivities(*values):
+    """compute_sensitivities, with the same optional DSO/DIO/DPO override as _metrics"""
+
+    *inputs, override = values
+    return compute_sensitivities(dict(zip(SENSITIVITY_INPUTS, inputs)), cycle_override=override)
+
+
+def build_working_capital_graph(inputs=None, figures=False):
+    """Graph of the dashboard's calculations
+
+    `inputs` maps the nine sidebar inputs (scalars or per-entity arrays) and
+    optionally cost_of_capital / ocf_margin. With figures=True the
+    single-company nodes are added too: insights, the tornado table and
+    every chart built by a create_* function in charts.py.
+    """
+
+    inputs = inputs or {}
+    graph = CalcGraph()
+    for name in INPUT_COLUMNS:
+        graph.add_input(name, inputs.get(name, 0.0))
+    graph.add_input('cost_of_capital', inputs.get('cost_of_capital', COST_OF_CAPITAL))
+    graph.add_input('ocf_margin', inputs.get('ocf_margin', OCF_MARGIN))
+    graph.add_input('cycle_override', inputs.get('cycle_override'))  # e.g. panel average-balance days
+
+    # Metrics, and the operating cycle within them: edits that leave the
+    # cycle unchanged stop here (early cutoff)
+    graph.add_node('metrics', _metrics, (*INPUT_COLUMNS, 'cycle_override'))
+    graph.add_node('cycle', lambda metrics: {key: metrics[key] for key in CYCLE_KEYS}, ('metrics',))
+
+    # Scenarios, cash flow and the DSO x DIO grid
+    graph.add_node('scenarios', generate_scenario_analysis, ('cycle', 'revenue', 'cogs', 'cost_of_capital'))
+    graph.add_node('cash_flow', calculate_cash_flow_impact, ('cycle', 'revenue', 'cogs', 'ocf_margin'))
+    graph.add_node('sensitivity_grid', lambda revenue, rate: calculate_sensitivity_grid(revenue, cost_of_capital=rate),
+                   ('revenue', 'cost_of_capital'))
+
+    if figures:
+        _add_dashboard_nodes(graph)
+    return graph
+
+
+def _add_dashboard_nodes(graph):
+    """Single-company nodes: insights, elasticities and every chart"""
+
+    graph.add_input('days_forecast')                  # learned quarterly changes (forecast_changes), or None
+    graph.add_input('tornado_output', 'ccc')
+    graph.add_input('tornado_label', 'Cash Conversion Cycle (days)')
+
+    graph.add_node('insights', generate_insights, ('metrics', 'cash_flow', 'scenarios'))
+    graph.add_node('sensitivities', _sensitivities, (*SENSITIVITY_INPUTS, 'cycle_override'))
+    graph.add_node('tornado', sensitivity_table, ('sensitivities', 'tornado_output'))
+
+    graph.add_node('fig_waterfall', lambda cycle: create_ccc_waterfall(cycle['dso'], cycle['dio'], cycle['dpo']),
+                   ('cycle',))
+    # The learned path starts from the displayed cycle, not the history entity's last quarter
+    graph.add_node('days_path', lambda cycle, changes: None if changes is None else rebase_forecast(changes, cycle),
+                   ('cycle', 'days_forecast'))
+    graph.add_node('fig_days_forecast',
+                   lambda cycle, forecast: None if forecast is None else create_days_forecast(cycle, forecast),
+                   ('cycle', 'days_path'))
+    graph.add_node('fig_forecast',
+                   lambda revenue, cogs, cycle, forecast: create_trend_forecast(
+                       revenue, cogs, cycle,
+                       days_forecast=quarterly_to_annual_days(forecast) if forecast is not None else None),
+                   ('revenue', 'cogs', 'cycle', 'days_path'))
+    graph.add_node('fig_sensitivity', lambda grid: create_sensitivity_analysis(grid[0]), ('sensitivity_grid',))
+    graph.add_node('fig_tornado', create_tornado_chart, ('tornado', 'tornado_label'))
+    graph.add_node('fig_benchmark', create_benchmark_comparison, ('metrics',))
+
+
+# ============================================================================
+# BATCH WHAT-IF
+# ============================================================================
+
+WHAT_IF_OUTPUTS = ('net_wc', 'current_ratio', 'ccc', 'net_cash_tied', 'fcf_impact_pct', 'best_impact')
+
+
+def _output(graph, name):
+    """Resolve an output name to a node, a metric, a cash-flow key or a best_/worst_ scenario key"""
+
+    if name in graph.nodes:
+        return graph.get(name)
+    if name in graph.get('metrics'):
+        return graph.get('metrics')[name]
+    case, _, key = name.partition('_')
+    if case in ('best', 'worst'):
+        return graph.get('scenarios')[case.title()][key]
+    return graph.get('cash_flow')[name]
+
+
+def what_if_session(portfolio, field, edits, outputs=WHAT_IF_OUTPUTS):
+    """Apply a sequence of edits to one input across every entity
+
+    Each edit is a scalar or per-entity array assigned to `field`, or a
+    callable applied to the original column. Returns (results, stats):
+    one row per (edit, entity) with the requested outputs, and the nodes
+    each edit recomputed.
+    """
+
+    columns = [*INPUT_COLUMNS, *(col for col in ('cost_of_capital', 'ocf_margin') if col in portfolio)]
+    graph = build_working_capital_graph({col: np.asarray(portfolio[col], dtype=float) for col in columns})
+    original = np.asarray(portfolio[field], dtype=float)
+    entity_ids = np.asarray(portfolio.get('entity_id', portfolio.index))
+    n = len(original)
+
+    for name in outputs:
+        _output(graph, name)  # warm the cache so every edit counts only its own recomputes
+
+    frames, stats = [], []
+    for i, edit in enumerate(edits):
+        value = edit(original) if callable(edit) else edit
+        graph.update(**{field: np.broadcast_to(np.asarray(value, dtype=float), n).copy()})
+        frames.append(pd.DataFrame({
+            'edit': i,
+            'entity_id': entity_ids,
+            field: graph.get(field),
+            **{name: np.broadcast_to(_output(graph, name), n) for name in outputs},
+        }))
+        stats.append({'edit': i, 'recomputed': len(graph.recomputed), 'nodes': ', '.join(graph.recomputed)})
+
+    return pd.concat(frames, ignore_index=True), pd.DataFrame(stats)
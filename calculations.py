@@ -0,0 +1,196 @@
+"""
+Working Capital Calculations
+
+The formulas behind every view: metrics, cash flow impact, best / worst
+scenarios and the insights drawn from them. They are plain arithmetic, so the same functions run one company
+(scalars, as in app.py and reports.py), a whole portfolio (one numpy array
+per input, as in portfolio.py) and the dual numbers of sensitivity.py.
+
+Zero denominators give 0 rather than an error, elementwise for arrays.
+"""
+
+import numpy as np
+
+COST_OF_CAPITAL = 0.08   # Annual rate for scenario cash impact
+OCF_MARGIN = 0.15        # Assumed operating cash flow margin
+
+
+def safe_div(num, den):
+    """num / den, or 0 where den is 0"""
+
+    if isinstance(num, np.ndarray) or isinstance(den, np.ndarray):
+        num = np.asarray(num, dtype=float)
+        den = np.asarray(den, dtype=float)
+        out = np.zeros(np.broadcast(num, den).shape)
+        np.divide(num, den, out=out, where=den != 0)
+        return out
+    return num / den if den else 0
+
+
+# ============================================================================
+# CALCULATIONS
+# ============================================================================
+
+def calculate_working_capital_metrics(revenue, cogs, cash, receivables, inventory,
+                                      other_ca, payables, short_debt, other_cl):
+    """Calculate comprehensive working capital metrics"""
+
+    total_ca = cash + receivables + inventory + other_ca
+    total_cl = payables + short_debt + other_cl
+
+    net_wc = total_ca - total_cl
+    current_ratio = safe_div(total_ca, total_cl)
+    quick_ratio = safe_div(cash + receivables, total_cl)
+    cash_ratio = safe_div(cash, total_cl)
+
+    # Operating cycle metrics
+    dso = safe_div(receivables, revenue) * 365
+    dio = safe_div(inventory, cogs) * 365
+    dpo = safe_div(payables, cogs) * 365
+    ccc = dso + dio - dpo
+
+    # Efficiency ratios
+    receivables_turnover = safe_div(revenue, receivables)
+    inventory_turnover = safe_div(cogs, inventory)
+    payables_turnover = safe_div(cogs, payables)
+
+    # Working capital ratios
+    wc_to_sales = safe_div(net_wc, revenue)
+    wc_to_assets = safe_div(net_wc, total_ca)
+
+    return {
+        'total_ca': total_ca,
+        'total_cl': total_cl,
+        'net_wc': net_wc,
+        'current_ratio': current_ratio,
+        'quick_ratio': quick_ratio,
+        'cash_ratio': cash_ratio,
+        'dso': dso,
+        'dio': dio,
+        'dpo': dpo,
+        'ccc': ccc,
+        'receivables_turnover': receivables_turnover,
+        'inventory_turnover': inventory_turnover,
+        'payables_turnover': payables_turnover,
+        'wc_to_sales': wc_to_sales,
+        'wc_to_assets': wc_to_assets,
+    }
+
+
+def generate_scenario_analysis(base_metrics, revenue, cogs, cost_of_capital=COST_OF_CAPITAL):
+    """Generate best/worst case scenarios"""
+
+    scenarios = {}
+
+    # Base case
+    scenarios['Base'] = base_metrics
+
+    # Best case: 20% improvement in collection, 15% in inventory efficiency
+    scenarios['Best'] = {
+        'dso': base_metrics['dso'] * 0.80,
+        'dio': base_metrics['dio'] * 0.85,
+        'dpo': base_metrics['dpo'] * 1.10,
+    }
+    scenarios['Best']['ccc'] = scenarios['Best']['dso'] + scenarios['Best']['dio'] - scenarios['Best']['dpo']
+    scenarios['Best']['impact'] = (base_metrics['ccc'] - scenarios['Best']['ccc']) / 365 * revenue * cost_of_capital
+
+    # Worst case: 20% deterioration
+    scenarios['Worst'] = {
+        'dso': base_metrics['dso'] * 1.20,
+        'dio': base_metrics['dio'] * 1.20,
+        'dpo': base_metrics['dpo'] * 0.90,
+    }
+    scenarios['Worst']['ccc'] = scenarios['Worst']['dso'] + scenarios['Worst']['dio'] - scenarios['Worst']['dpo']
+    scenarios['Worst']['impact'] = (scenarios['Worst']['ccc'] - base_metrics['ccc']) / 365 * revenue * cost_of_capital
+
+    return scenarios
+
+
+def calculate_cash_flow_impact(metrics, revenue, cogs, ocf_margin=OCF_MARGIN):
+    """Calculate cash flow impact of working capital changes"""
+
+    # Calculate daily cash requirements
+    daily_revenue = revenue / 365
+    daily_cogs = cogs / 365
+
+    # Cash tied up in operations
+    cash_in_receivables = metrics['dso'] * daily_revenue
+    cash_in_inventory = metrics['dio'] * daily_cogs
+    cash_from_payables = metrics['dpo'] * daily_cogs
+
+    net_cash_tied = cash_in_receivables + cash_in_inventory - cash_from_payables
+
+    # Free cash flow impact
+    operating_cash_flow = revenue * ocf_margin
+    fcf_impact_pct = safe_div(net_cash_tied, operating_cash_flow) * 100
+
+    return {
+        'cash_in_receivables': cash_in_receivables,
+        'cash_in_inventory': cash_in_inventory,
+        'cash_from_payables': cash_from_payables,
+        'net_cash_tied': net_cash_tied,
+        'fcf_impact_pct': fcf_impact_pct,
+    }
+
+
+# ============================================================================
+# INSIGHT GENERATION
+# ============================================================================
+
+def generate_insights(metrics, cash_flow_impact, scenarios):
+    """Generate AI-powered insights"""
+    
+    insights = []
+    
+    # Liquidity insights
+    if metrics['current_ratio'] < 1.0:
+        insights.append({
+            'type': 'danger',
+            'title': 'Critical Liquidity Risk',
+            'message': f"Current ratio of {metrics['current_ratio']:.2f} indicates potential inability to meet short-term obligations. Immediate action required."
+        })
+    elif metrics['current_ratio'] < 1.5:
+        insights.append({
+            'type': 'warning',
+            'title': 'Liquidity Concern',
+            'message': f"Current ratio of {metrics['current_ratio']:.2f} is below healthy threshold of 1.5. Consider strengthening liquidity position."
+        })
+    else:
+        insights.append({
+            'type': 'success',
+            'title': 'Strong Liquidity',
+            'message': f"Current ratio of {metrics['current_ratio']:.2f} indicates healthy liquidity position."
+        })
+    
+    # CCC insights
+    if metrics['ccc'] < 0:
+        insights.append({
+            'type': 'success',
+            'title': 'Negative CCC - Cash Advantage',
+            'message': f"Negative CCC of {metrics['ccc']:.1f} days means suppliers are financing operations. Excellent working capital management."
+        })
+    elif metrics['ccc'] > 90:
+        insights.append({
+            'type': 'warning',
+            'title': 'Extended CCC',
+            'message': f"CCC of {metrics['ccc']:.1f} days is high. Consider improving collection (DSO: {metrics['dso']:.1f}d) or inventory efficiency (DIO: {metrics['dio']:.1f}d)."
+        })
+    
+    # Cash flow insights
+    if cash_flow_impact['fcf_impact_pct'] > 50:
+        insights.append({
+            'type': 'warning',
+            'title': 'Significant Cash Tied in Working Capital',
+            'message': f"{cash_flow_impact['fcf_impact_pct']:.1f}% of operating cash flow is tied in working capital. Optimization could release ₹{cash_flow_impact['net_cash_tied']/1_000_000:.1f}M."
+        })
+    
+    # Improvement potential
+    improvement_potential = scenarios['Best']['impact']
+    if improvement_potential > 1_000_000:
+        insights.append({
+            'type': 'info',
+            'title': 'Optimization Opportunity',
+            'message': f"Optimizing CCC could release up to ₹{improvement_potential/1_000_000:.1f}M in cash (Best case scenario)."
+        })
+    
+    return insights
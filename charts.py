@@ -0,0 +1,300 @@
+"""
+Dashboard Charts
+
+Branding colours, the shared Plotly template and the figure builders used by
+the live dashboard (app.py), the calculation graph (calc_graph.py) and the
+batch CFO reports (reports.py). Nothing here depends on Streamlit, so the
+builders can be imported outside a running app.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from portfolio import GRID_DAY_CHANGES
+
+# ============================================================================
+# BRANDING
+# ============================================================================
+
+COLORS = {
+    'dark_blue': '#003366',
+    'medium_blue': '#004d80',
+    'accent_gold': '#FFD700',
+    'bg_dark': '#0a1628',
+    'card_bg': '#112240',
+    'text_primary': '#e6f1ff',
+    'text_secondary': '#8892b0',
+    'success': '#10b981',
+    'warning': '#f59e0b',
+    'danger': '#ef4444',
+}
+
+BRANDING = {
+    'name': 'The Mountain Path - World of Finance',
+    'instructor': 'Prof. V. Ravichandran',
+    'credentials': '28+ Years Corporate Finance & Banking | 10+ Years Academic Excellence',
+    'icon': '🏔️',
+}
+
+# ============================================================================
+# FIGURE TEMPLATE
+# ============================================================================
+
+# Shared look for every chart. Figures reference it by name instead of each
+# repeating the same update_layout styling (and instead of shipping
+# Streamlit's much larger default template with every figure).
+FIGURE_TEMPLATE = 'mountain_path'
+
+_GRID = 'rgba(136, 146, 176, 0.2)'
+
+pio.templates[FIGURE_TEMPLATE] = go.layout.Template(layout=dict(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color=COLORS['text_primary']),
+    colorway=[COLORS['accent_gold'], COLORS['success'], COLORS['warning'], COLORS['danger'],
+              COLORS['medium_blue'], COLORS['text_secondary']],
+    xaxis=dict(gridcolor=_GRID, zerolinecolor=_GRID, linecolor=_GRID),
+    yaxis=dict(gridcolor=_GRID, zerolinecolor=_GRID, linecolor=_GRID),
+    polar=dict(bgcolor='rgba(0,0,0,0)'),
+    hoverlabel=dict(bgcolor=COLORS['card_bg']),
+))
+
+
+def compact(values, decimals):
+    """Round trace data to the precision shown (keeps float64, so rupee amounts stay exact)"""
+    return np.round(np.asarray(values, dtype=float), decimals).tolist()
+
+
+# ============================================================================
+# VISUALIZATION FUNCTIONS
+# ============================================================================
+
+def create_ccc_waterfall(dso, dio, dpo):
+    """Create waterfall chart for Cash Conversion Cycle"""
+    
+    fig = go.Figure(go.Waterfall(
+        orientation="v",
+        measure=["relative", "relative", "relative", "total"],
+        x=["DSO", "DIO", "DPO", "CCC"],
+        y=compact([dso, dio, -dpo], 1) + [None],
+        text=[f"{dso:.1f}", f"{dio:.1f}", f"-{dpo:.1f}", f"{dso+dio-dpo:.1f}"],
+        textposition="outside",
+        connector={"line": {"color": COLORS['text_secondary']}},
+        increasing={"marker": {"color": COLORS['danger']}},
+        decreasing={"marker": {"color": COLORS['success']}},
+        totals={"marker": {"color": COLORS['accent_gold']}},
+    ))
+    
+    fig.update_layout(
+        template=FIGURE_TEMPLATE,
+        title="Cash Conversion Cycle Waterfall",
+        showlegend=False,
+        height=400,
+    )
+    
+    return fig
+
+
+def create_trend_forecast(revenue, cogs, metrics, years=5, days_forecast=None):
+    """Create multi-year working capital forecast
+
+    `days_forecast` optionally maps 'dso'/'dio'/'dpo' to one value per year
+    (see forecasting.quarterly_to_annual_days); otherwise today's days are
+    held flat.
+    """
+    
+    growth_scenarios = {
+        'Conservative': 0.05,
+        'Base': 0.10,
+        'Aggressive': 0.15,
+    }
+    
+    fig = go.Figure()
+    
+    for scenario, growth in growth_scenarios.items():
+        wc_values = []
+        years_list = []
+        
+        for year in range(years + 1):
+            if days_forecast is not None and year > 0:
+                dso, dio, dpo = (days_forecast[m][year - 1] for m in ('dso', 'dio', 'dpo'))
+            else:
+                dso, dio, dpo = metrics['dso'], metrics['dio'], metrics['dpo']
+
+            rev = revenue * (1 + growth) ** year
+            rec = (dso / 365) * rev
+            inv = (dio / 365) * cogs * (1 + growth) ** year
+            pay = (dpo / 365) * cogs * (1 + growth) ** year
+            wc = rec + inv - pay
+            
+            wc_values.append(wc)
+            years_list.append(f"Year {year}")
+        
+        fig.add_trace(go.Scatter(
+            x=years_list,
+            y=compact(wc_values, 0),
+            mode='lines+markers',
+            name=f"{scenario} ({growth*100:.0f}%)",
+            line=dict(width=3),
+            hovertemplate="₹%{y:,.0f}",
+        ))
+    
+    fig.update_layout(
+        title=f"Working Capital Forecast ({years}-Year{', Learned Days' if days_forecast is not None else ''})",
+        xaxis_title="Year",
+        yaxis_title="Working Capital (₹)",
+        template=FIGURE_TEMPLATE,
+        hovermode='x unified',
+        height=450,
+    )
+    
+    return fig
+
+
+def create_days_forecast(metrics, forecast):
+    """Create quarterly DSO/DIO/DPO/CCC forecast chart from learned predictions"""
+
+    quarters = ["Now"] + [f"Q+{h}" for h in forecast['horizon']]
+    series = {
+        'DSO': COLORS['accent_gold'],
+        'DIO': COLORS['warning'],
+        'DPO': COLORS['success'],
+        'CCC': COLORS['danger'],
+    }
+
+    fig = go.Figure()
+
+    for name, color in series.items():
+        fig.add_trace(go.Scatter(
+            x=quarters,
+            y=compact([metrics[name.lower()]] + list(forecast[name.lower()]), 1),
+            mode='lines+markers',
+            name=name,
+            line=dict(color=color, width=3, dash='dot' if name == 'CCC' else 'solid'),
+        ))
+
+    fig.update_layout(
+        title="Learned Operating Cycle Forecast",
+        xaxis_title="Quarter",
+        yaxis_title="Days",
+        template=FIGURE_TEMPLATE,
+        hovermode='x unified',
+        height=400,
+    )
+
+    return fig
+
+
+def create_sensitivity_analysis(grid, dso_range=GRID_DAY_CHANGES, dio_range=GRID_DAY_CHANGES):
+    """Create sensitivity analysis heatmap from one entity's calculate_sensitivity_grid (DIO x DSO)"""
+    
+    impact_matrix = np.asarray(grid) / 1_000_000  # In millions
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=compact(impact_matrix, 2),
+        x=[f"{x:+.0f}" for x in dso_range],
+        y=[f"{y:+.0f}" for y in dio_range],
+        colorscale='RdYlGn_r',
+        texttemplate='%{z:.1f}M',
+        textfont={"size": 10},
+        colorbar=dict(title="Cash Impact (₹M)"),
+    ))
+    
+    fig.update_layout(
+        title="Sensitivity Analysis: DSO vs DIO Impact on Cash",
+        xaxis_title="DSO Change (days)",
+        yaxis_title="DIO Change (days)",
+        template=FIGURE_TEMPLATE,
+        height=450,
+    )
+    
+    return fig
+
+
+def create_tornado_chart(table, output_label, shock=0.10):
+    """Create tornado chart of output swings from ±shock changes in each input"""
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=list(table['label']),
+        x=compact(table['low'], 2),
+        orientation='h',
+        name=f"Input -{shock:.0%}",
+        marker_color=COLORS['danger'],
+        customdata=compact(table['elasticity'], 2),
+        hovertemplate="%{y}: %{x:,.2f} (elasticity %{customdata:.2f})<extra></extra>",
+    ))
+
+    fig.add_trace(go.Bar(
+        y=list(table['label']),
+        x=compact(table['high'], 2),
+        orientation='h',
+        name=f"Input +{shock:.0%}",
+        marker_color=COLORS['success'],
+        customdata=compact(table['elasticity'], 2),
+        hovertemplate="%{y}: %{x:,.2f} (elasticity %{customdata:.2f})<extra></extra>",
+    ))
+
+    fig.update_layout(
+        title=f"Tornado: Drivers of {output_label}",
+        xaxis_title=f"Change in {output_label}",
+        barmode='overlay',
+        template=FIGURE_TEMPLATE,
+        height=450,
+    )
+
+    return fig
+
+
+def create_benchmark_comparison(metrics):
+    """Create benchmark comparison radar chart"""
+    
+    # Industry benchmarks (example values)
+    categories = ['Current Ratio', 'Quick Ratio', 'DSO Efficiency', 'DIO Efficiency', 'CCC Efficiency']
+    
+    # Normalize metrics to 0-100 scale
+    current_values = [
+        min(metrics['current_ratio'] / 2.0 * 100, 100),  # Target: 2.0
+        min(metrics['quick_ratio'] / 1.5 * 100, 100),    # Target: 1.5
+        min(60 / max(metrics['dso'], 1) * 100, 100),     # Target: 60 days
+        min(45 / max(metrics['dio'], 1) * 100, 100),     # Target: 45 days
+        min(90 / max(abs(metrics['ccc']), 1) * 100, 100) if metrics['ccc'] > 0 else 100,
+    ]
+    
+    industry_avg = [70, 65, 60, 55, 50]  # Example industry averages
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatterpolar(
+        r=compact(current_values, 1),
+        theta=categories,
+        fill='toself',
+        name='Current',
+        line=dict(color=COLORS['accent_gold'], width=2),
+    ))
+    
+    fig.add_trace(go.Scatterpolar(
+        r=industry_avg,
+        theta=categories,
+        fill='toself',
+        name='Industry Avg',
+        line=dict(color=COLORS['text_secondary'], width=2),
+        opacity=0.6,
+    ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                gridcolor=COLORS['text_secondary'],
+            ),
+        ),
+        showlegend=True,
+        template=FIGURE_TEMPLATE,
+        height=450,
+    )
+    
+    return fig
@@ -0,0 +1,259 @@
+"""
+ERP Data Connectors
+
+Pull balances, AR / AP open items and revenue / COGS for many entities from
+ERP-style REST or database endpoints instead of typing them into the sidebar.
+
+Both connectors are asyncio-based with bounded concurrency (a semaphore),
+pooled connections (one aiohttp connector, or a fixed pool of database
+connections), retries with exponential backoff and jitter, and incremental
+"changed since" sync. A refresh of 10k entities is therefore limited by the
+concurrency limit rather than by round-trip latency.
+
+The REST contract is the one served by mock_erp.py:
+
+    GET /entities?changed_since=ISO-8601   -> {"server_time": ..., "entities": [{"entity_id", "updated_at"}]}
+    GET /entities/{id}/balances            -> {cash, receivables, inventory, other_ca, payables, short_debt, other_cl}
+    GET /entities/{id}/financials          -> {revenue, cogs}   (annual)
+    GET /entities/{id}/open-items?type=AR  -> [{"item_id", "amount", "due_date"}, ...]   (also type=AP)
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+from pathlib import Path
+
+import aiohttp
+import pandas as pd
+
+from portfolio import INPUT_COLUMNS
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ERPError(Exception):
+    """Raised when an entity cannot be fetched after all retries"""
+
+
+# ============================================================================
+# REST CONNECTOR
+# ============================================================================
+
+class RestERPConnector:
+    """Async REST connector with a pooled session, bounded concurrency and retries"""
+
+    def __init__(self, base_url, concurrency=100, pool_size=100, retries=4, backoff=0.1,
+                 timeout=30, headers=None, include_open_items=True):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.include_open_items = include_open_items
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    async def _get(self, session, path, params=None):
+        """GET with exponential backoff + jitter on connection errors and retryable statuses"""
+
+        for attempt in range(self.retries + 1):
+            self.stats['requests'] += 1
+            try:
+                async with session.get(f"{self.base_url}{path}", params=params) as response:
+                    if response.status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return await response.json()
+                    error = ERPError(f"GET {path}: HTTP {response.status}")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                error = ERPError(f"GET {path}: {exc!r}")
+
+            if attempt < self.retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+        raise error
+
+    async def _fetch_entity(self, session, semaphore, entity_id):
+        async with semaphore:
+            base = f"/entities/{entity_id}"
+            requests = [self._get(session, f"{base}/balances"), self._get(session, f"{base}/financials")]
+            if self.include_open_items:
+                requests += [
+                    self._get(session, f"{base}/open-items", {'type': 'AR'}),
+                    self._get(session, f"{base}/open-items", {'type': 'AP'}),
+                ]
+            balances, financials, *open_items = await asyncio.gather(*requests)
+
+        return entity_id, {**balances, **financials}, open_items
+
+    def _session(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        return aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                     timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def list_changed(self, changed_since=None):
+        """Entity ids changed since a watermark, and the server's new watermark"""
+
+        async with self._session() as session:
+            params = {'changed_since': changed_since} if changed_since else None
+            payload = await self._get(session, '/entities', params)
+        return [row['entity_id'] for row in payload['entities']], payload['server_time']
+
+    async def fetch_entities(self, entity_ids):
+        """Fetch every entity concurrently; returns (portfolio, open items, failed ids)"""
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._session() as session:
+            results = await asyncio.gather(
+                *(self._fetch_entity(session, semaphore, entity_id) for entity_id in entity_ids),
+                return_exceptions=True,
+            )
+
+        return _collect(entity_ids, results, self.stats)
+
+
+# ============================================================================
+# DATABASE CONNECTOR
+# ============================================================================
+
+class DatabaseERPConnector:
+    """Async connector over an ERP database (SQLite here) with a fixed connection pool
+
+    Blocking DB calls run in worker threads; the pool bounds both open
+    connections and concurrent queries. Table layout matches
+    mock_erp.create_mock_database.
+    """
+
+    def __init__(self, path, pool_size=8, retries=4, backoff=0.1, include_open_items=True):
+        self.path = str(path)
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.include_open_items = include_open_items
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._pool = None
+
+    async def _acquire(self):
+        if self._pool is None:
+            self._pool = asyncio.Queue()
+            for _ in range(self.pool_size):
+                self._pool.put_nowait(sqlite3.connect(self.path, check_same_thread=False))
+        return await self._pool.get()
+
+    async def _query(self, sql, params=()):
+        """Query with exponential backoff + jitter on operational errors (e.g. database locked)"""
+
+        connection = await self._acquire()
+        try:
+            for attempt in range(self.retries + 1):
+                self.stats['requests'] += 1
+                try:
+                    return await asyncio.to_thread(lambda: connection.execute(sql, params).fetchall())
+                except sqlite3.OperationalError as exc:
+                    error = ERPError(f"query failed: {exc!r}")
+
+                if attempt < self.retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+            raise error
+        finally:
+            self._pool.put_nowait(connection)
+
+    async def close(self):
+        while self._pool is not None and not self._pool.empty():
+            self._pool.get_nowait().close()
+        self._pool = None
+
+    async def list_changed(self, changed_since=None):
+        """Entity ids changed since a watermark, and the new watermark"""
+
+        rows = await self._query(
+            "SELECT entity_id, updated_at FROM entities WHERE updated_at > ? ORDER BY entity_id",
+            (changed_since or '',),
+        )
+        server_time = (await self._query("SELECT COALESCE(MAX(updated_at), '') FROM entities"))[0][0]
+        return [row[0] for row in rows], server_time
+
+    async def _fetch_entity(self, entity_id):
+        columns = ', '.join(INPUT_COLUMNS)
+        (row,) = await self._query(
+            f"SELECT {columns} FROM balances JOIN financials USING (entity_id) WHERE entity_id = ?",
+            (entity_id,),
+        )
+        open_items = []
+        if self.include_open_items:
+            for item_type in ('AR', 'AP'):
+                items = await self._query(
+                    "SELECT item_id, amount, due_date FROM open_items WHERE entity_id = ? AND type = ?",
+                    (entity_id, item_type),
+                )
+                open_items.append([dict(zip(('item_id', 'amount', 'due_date'), item)) for item in items])
+        return entity_id, dict(zip(INPUT_COLUMNS, row)), open_items
+
+    async def fetch_entities(self, entity_ids):
+        """Fetch every entity through the pool; returns (portfolio, open items, failed ids)"""
+
+        try:
+            results = await asyncio.gather(*(self._fetch_entity(e) for e in entity_ids), return_exceptions=True)
+        finally:
+            await self.close()
+        return _collect(entity_ids, results, self.stats)
+
+
+# ============================================================================
+# RESULTS AND INCREMENTAL SYNC
+# ============================================================================
+
+def _collect(entity_ids, results, stats):
+    """Split gathered results into a portfolio frame, open items and failures"""
+
+    rows, items, failed = [], [], []
+    for entity_id, result in zip(entity_ids, results):
+        if isinstance(result, BaseException):
+            stats['failures'] += 1
+            failed.append(entity_id)
+            continue
+        _, values, open_items = result
+        rows.append({'entity_id': entity_id, **{col: values[col] for col in INPUT_COLUMNS}})
+        for item_type, entries in zip(('AR', 'AP'), open_items):
+            items.extend({'entity_id': entity_id, 'type': item_type, **entry} for entry in entries)
+
+    portfolio = pd.DataFrame(rows, columns=['entity_id', *INPUT_COLUMNS])
+    open_items = pd.DataFrame(items, columns=['entity_id', 'type', 'item_id', 'amount', 'due_date'])
+    return portfolio, open_items, failed
+
+
+async def sync_portfolio(connector, state_dir):
+    """Incremental "changed since" sync into a local Parquet cache
+
+    Only entities changed since the stored watermark are fetched and merged
+    into the cached portfolio. Failed entities are not lost: the watermark
+    only advances when every changed entity was fetched.
+    """
+
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state_path = state_dir / 'sync_state.json'
+    cache_path = state_dir / 'portfolio.parquet'
+
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    changed, server_time = await connector.list_changed(state.get('watermark'))
+    fetched, _, failed = await connector.fetch_entities(changed)
+
+    if cache_path.exists():
+        cached = pd.read_parquet(cache_path)
+        portfolio = pd.concat([cached[~cached['entity_id'].isin(fetched['entity_id'])], fetched],
+                              ignore_index=True)
+    else:
+        portfolio = fetched
+    portfolio.to_parquet(cache_path, index=False)
+
+    if not failed:
+        state['watermark'] = server_time
+    state_path.write_text(json.dumps(state))
+
+    return portfolio, {'changed': len(changed), 'fetched': len(fetched), 'failed': failed,
+                       'watermark': state.get('watermark')}
@@ -0,0 +1,364 @@
+"""
+Learned DSO / DIO / DPO Forecasting
+
+Replaces the flat "today's days forever" assumption in create_trend_forecast
+with a gradient-boosted forecaster trained on each entity's quarterly history
+and segment features.
+
+History is supplied in long format, one row per (entity_id, period), with
+the columns in METRICS plus any segment / size features. Periods are parsed
+to quarters as in panel.py (dates, "Q2 2022", pandas Periods or integer
+period numbers), so text periods are ordered chronologically.
+"""
+
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from panel import period_ordinal
+
+METRICS = ('dso', 'dio', 'dpo')
+
+MAX_HORIZON = 12
+
+# Where benchmarks/bench_forecasting.py --save writes the model and app.py loads it
+FORECAST_MODEL_PATH = Path(__file__).parent / 'models' / 'wc_forecaster.joblib'
+
+
+# ============================================================================
+# PANEL HELPERS
+# ============================================================================
+
+def build_panel(history, entity_col='entity_id', period_col='period'):
+    """Pivot long history into an (entities x periods x metrics) array
+
+    Periods come back as their original labels in chronological order.
+    """
+
+    entities, entity_idx = np.unique(history[entity_col].to_numpy(), return_inverse=True)
+    _, first, period_idx = np.unique(period_ordinal(history[period_col], 'Q'),
+                                     return_index=True, return_inverse=True)
+    periods = history[period_col].to_numpy()[first]
+
+    cells = entity_idx * len(periods) + period_idx
+    if len(np.unique(cells)) < len(cells):
+        raise ValueError(f"history has more than one row per {entity_col} and quarter")
+
+    panel = np.full((len(entities), len(periods), len(METRICS)), np.nan)
+    panel[entity_idx, period_idx] = history[list(METRICS)].to_numpy(dtype=float)
+
+    return entities, periods, panel
+
+
+def _static_features(history, entities, categorical_cols, numeric_cols, categories,
+                     entity_col='entity_id', period_col='period'):
+    """Latest segment / size features per entity, aligned with `entities`"""
+
+    latest = (history.assign(**{period_col: period_ordinal(history[period_col], 'Q')})
+              .sort_values([entity_col, period_col])
+              .drop_duplicates(entity_col, keep='last')
+              .set_index(entity_col)
+              .reindex(entities))
+
+    columns = []
+    for col in categorical_cols:
+        codes = pd.Categorical(latest[col], categories=categories[col]).codes.astype(float)
+        codes[codes < 0] = np.nan  # unseen segment -> treated as missing
+        columns.append(codes)
+    for col in numeric_cols:
+        columns.append(np.log1p(latest[col].to_numpy(dtype=float).clip(min=0)))
+
+    if not columns:
+        return np.empty((len(entities), 0))
+    return np.column_stack(columns)
+
+
+# ============================================================================
+# FORECASTER
+# ============================================================================
+
+class WorkingCapitalForecaster:
+    """Direct multi-horizon forecaster for DSO, DIO and DPO
+
+    One HistGradientBoostingRegressor per metric predicts the change from the
+    last observed value, with the horizon as a feature, so a single predict
+    call scores every entity and every horizon at once.
+    """
+
+    def __init__(self, horizon=8, lags=4, categorical_cols=('segment',), numeric_cols=('revenue',),
+                 max_iter=200, learning_rate=0.1, max_origins=8, random_state=42):
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f"horizon must be between 1 and {MAX_HORIZON} quarters")
+
+        self.horizon = horizon
+        self.lags = lags
+        self.categorical_cols = tuple(categorical_cols)
+        self.numeric_cols = tuple(numeric_cols)
+        self.max_iter = max_iter
+        self.learning_rate = learning_rate
+        self.max_origins = max_origins
+        self.random_state = random_state
+
+        self.categories_ = None
+        self.models_ = None
+
+    # ------------------------------------------------------------------
+    # Feature construction
+    # ------------------------------------------------------------------
+
+    def _design(self, window, static):
+        """Stack lag, momentum, static and horizon features for every horizon"""
+
+        n = window.shape[0]
+        base = np.hstack([
+            window.reshape(n, -1),
+            window[:, :, -1] - window[:, :, 0],
+            static,
+        ])
+        horizons = np.arange(1, self.horizon + 1, dtype=float)
+
+        X = np.repeat(base, self.horizon, axis=0)
+        return np.column_stack([X, np.tile(horizons, n)])
+
+    def _training_set(self, history):
+        entities, _, panel = build_panel(history)
+        static = _static_features(history, entities, self.categorical_cols,
+                                  self.numeric_cols, self.categories_)
+
+        n_entities, n_periods, n_metrics = panel.shape
+        if n_periods < self.lags + 1:
+            raise ValueError(f"need at least {self.lags + 1} periods of history to train")
+
+        # Pad the future with NaN so late origins contribute their observed horizons
+        padded = np.concatenate([panel, np.full((n_entities, self.horizon, n_metrics), np.nan)], axis=1)
+        windows = np.lib.stride_tricks.sliding_window_view(panel, self.lags, axis=1)
+        n_origins = windows.shape[1] - 1  # the last origin has no observed future
+        first = max(0, n_origins - self.max_origins)
+
+        X_blocks, y_blocks = [], []
+        for origin in range(first, n_origins):
+            window = windows[:, origin]                      # (entities, metrics, lags)
+            t = origin + self.lags - 1
+            future = padded[:, t + 1:t + 1 + self.horizon]    # (entities, horizon, metrics)
+            X_blocks.append(self._design(window, static))
+            y_blocks.append((future - window[:, None, :, -1]).reshape(-1, n_metrics))
+
+        return np.vstack(X_blocks), np.vstack(y_blocks)
+
+    # ------------------------------------------------------------------
+    # Fitting
+    # ------------------------------------------------------------------
+
+    def _new_model(self, n_features):
+        categorical = np.zeros(n_features, dtype=bool)
+        offset = len(METRICS) * (self.lags + 1)
+        categorical[offset:offset + len(self.categorical_cols)] = True
+
+        return HistGradientBoostingRegressor(
+            max_iter=self.max_iter,
+            learning_rate=self.learning_rate,
+            categorical_features=categorical,
+            early_stopping=False,
+            warm_start=True,
+            random_state=self.random_state,
+        )
+
+    def fit(self, history):
+        """Train one model per metric from scratch"""
+
+        self.categories_ = {
+            col: sorted(history[col].dropna().unique()) for col in self.categorical_cols
+        }
+        X, y = self._training_set(history)
+
+        self.models_ = {}
+        for j, metric in enumerate(METRICS):
+            mask = ~np.isnan(y[:, j])
+            model = self._new_model(X.shape[1])
+            model.fit(X[mask], y[mask, j])
+            self.models_[metric] = model
+
+        return self
+
+    def retrain(self, history, extra_iter=50):
+        """Warm-start retraining: add `extra_iter` boosting rounds fitted on new history"""
+
+        if self.models_ is None:
+            return self.fit(history)
+
+        X, y = self._training_set(history)
+        for j, metric in enumerate(METRICS):
+            mask = ~np.isnan(y[:, j])
+            model = self.models_[metric]
+            model.max_iter = model.n_iter_ + extra_iter
+            model.fit(X[mask], y[mask, j])
+
+        return self
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def covers(self, history):
+        """True if fitted on the columns and segment values present in `history`"""
+
+        if self.models_ is None:
+            return False
+        required = (*METRICS, *self.categorical_cols, *self.numeric_cols)
+        if any(col not in history for col in required):
+            return False
+        return all(set(history[col].dropna().unique()) <= set(self.categories_[col])
+                   for col in self.categorical_cols)
+
+    def inference_inputs(self, history):
+        """Entity ids, last `lags` observations (entities, metrics, lags) and static features"""
+
+        if self.models_ is None:
+            raise RuntimeError("forecaster has not been fitted")
+
+        entities, _, panel = build_panel(history)
+        if panel.shape[1] < self.lags:
+            raise ValueError(f"need at least {self.lags} periods of history to predict")
+
+        static = _static_features(history, entities, self.categorical_cols,
+                                  self.numeric_cols, self.categories_)
+        window = np.ascontiguousarray(panel[:, -self.lags:].swapaxes(1, 2))
+        return entities, window, static
+
+    def predict_window(self, window, static):
+        """Forecast DSO/DIO/DPO/CCC arrays (entities * horizon) from prepared inputs"""
+
+        X = self._design(window, static)
+        last = np.repeat(window[:, :, -1], self.horizon, axis=0)
+
+        forecast = {
+            metric: np.clip(last[:, j] + self.models_[metric].predict(X), 0, None)
+            for j, metric in enumerate(METRICS)
+        }
+        forecast['ccc'] = forecast['dso'] + forecast['dio'] - forecast['dpo']
+        return forecast
+
+    def predict(self, history):
+        """Forecast every entity's next `horizon` quarters in one vectorized pass"""
+
+        entities, window, static = self.inference_inputs(history)
+
+        forecast = pd.DataFrame({
+            'entity_id': np.repeat(entities, self.horizon),
+            'horizon': np.tile(np.arange(1, self.horizon + 1), len(entities)),
+        })
+        for metric, values in self.predict_window(window, static).items():
+            forecast[metric] = values
+
+        return forecast
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """Persist the fitted forecaster with joblib"""
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a forecaster saved with `save`"""
+
+        model = joblib.load(path)
+        if not isinstance(model, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return model
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+def evaluate_forecaster(history, holdout=None, **forecaster_kwargs):
+    """Hold out the last periods, report accuracy vs flat extrapolation and latency"""
+
+    forecaster = WorkingCapitalForecaster(**forecaster_kwargs)
+    holdout = holdout or forecaster.horizon
+
+    ordinals = period_ordinal(history['period'], 'Q')
+    periods = np.unique(ordinals)
+    cutoff = periods[-holdout - 1]
+    train = history[ordinals <= cutoff]
+    actual = history[ordinals > cutoff].copy()
+    actual['horizon'] = np.searchsorted(periods, ordinals[ordinals > cutoff]) - np.searchsorted(periods, cutoff)
+
+    start = time.perf_counter()
+    forecaster.fit(train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    forecast = forecaster.predict(train)
+    predict_seconds = time.perf_counter() - start
+
+    last = history[ordinals == cutoff].set_index('entity_id')[list(METRICS)]
+    scored = actual.merge(forecast, on=['entity_id', 'horizon'], suffixes=('', '_pred'))
+    flat = last.reindex(scored['entity_id']).to_numpy()
+
+    rows = []
+    for j, metric in enumerate(METRICS):
+        error = scored[f'{metric}_pred'] - scored[metric]
+        naive = flat[:, j] - scored[metric].to_numpy()
+        by_h = pd.DataFrame({'horizon': scored['horizon'], 'err': error.abs(), 'naive': np.abs(naive)})
+        for h, group in by_h.groupby('horizon'):
+            rows.append({
+                'metric': metric.upper(),
+                'horizon': h,
+                'mae': group['err'].mean(),
+                'flat_mae': group['naive'].mean(),
+            })
+
+    accuracy = pd.DataFrame(rows)
+    latency = {
+        'entities': int(train['entity_id'].nunique()),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'entities_per_second': train['entity_id'].nunique() / max(predict_seconds, 1e-9),
+    }
+
+    return forecaster, accuracy, latency
+
+
+def quarterly_to_annual_days(forecast, years=5):
+    """Year-end (every 4th quarter) days per metric, held flat beyond the horizon"""
+
+    horizon = int(forecast['horizon'].max())
+    quarters = np.minimum(np.arange(1, years + 1) * 4, horizon)
+    by_h = forecast.set_index('horizon')
+
+    return {metric: by_h.loc[quarters, metric].to_numpy() for metric in METRICS}
+
+
+def forecast_changes(forecast, history):
+    """Forecast days minus each entity's last observed days in `history`
+
+    The learned path as deltas, so it can be applied to other starting days
+    (see rebase_forecast).
+    """
+
+    entities, _, panel = build_panel(history)
+    last = pd.DataFrame(panel[:, -1], index=entities, columns=list(METRICS)).reindex(forecast['entity_id'])
+
+    changes = forecast.copy()
+    for metric in METRICS:
+        changes[metric] = forecast[metric].to_numpy() - last[metric].to_numpy()
+    changes['ccc'] = changes['dso'] + changes['dio'] - changes['dpo']
+    return changes
+
+
+def rebase_forecast(changes, days):
+    """Apply forecast changes to starting days (a mapping with 'dso'/'dio'/'dpo')"""
+
+    forecast = changes.copy()
+    for metric in METRICS:
+        forecast[metric] = np.clip(days[metric] + changes[metric], 0, None)
+    forecast['ccc'] = forecast['dso'] + forecast['dio'] - forecast['dpo']
+    return forecast
@@ -0,0 +1,169 @@
+"""
+Local Mock ERP
+
+Serves deterministic synthetic ERP data over the REST contract used by
+erp_connectors.RestERPConnector, with configurable latency and a random
+failure rate so retries and concurrency can be tested and benchmarked
+offline. The same data can be written to a SQLite database for
+DatabaseERPConnector.
+
+    python -m mock_erp --entities 10000 --port 8765 --latency 0.05 --failure-rate 0.02
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+from aiohttp import web
+
+from synthetic import generate_portfolio
+
+BALANCE_COLUMNS = ('cash', 'receivables', 'inventory', 'other_ca', 'payables', 'short_debt', 'other_cl')
+ITEMS_PER_ENTITY = 5
+
+
+class MockERPData:
+    """Synthetic entities with update timestamps and AR / AP open items"""
+
+    def __init__(self, n_entities, seed=42):
+        self.portfolio = generate_portfolio(n_entities, seed).set_index('entity_id')
+        rng = np.random.default_rng(seed)
+        now = datetime.now(timezone.utc)
+        minutes_ago = rng.integers(0, 60 * 24 * 30, size=n_entities)
+        self.updated_at = [(now - timedelta(minutes=int(m))).isoformat() for m in minutes_ago]
+        self.split = rng.dirichlet(np.ones(ITEMS_PER_ENTITY), size=n_entities)
+        self.due_offsets = rng.integers(-30, 90, size=(n_entities, ITEMS_PER_ENTITY))
+
+    def touch(self, entity_ids):
+        """Mark entities as changed now (to exercise incremental sync)"""
+        now = datetime.now(timezone.utc).isoformat()
+        for entity_id in entity_ids:
+            self.updated_at[entity_id] = now
+
+    def open_items(self, entity_id, item_type):
+        total = self.portfolio.at[entity_id, 'receivables' if item_type == 'AR' else 'payables']
+        today = date.today()
+        return [
+            {
+                'item_id': f"{item_type}-{entity_id}-{i}",
+                'amount': float(total * self.split[entity_id, i]),
+                'due_date': (today + timedelta(days=int(self.due_offsets[entity_id, i]))).isoformat(),
+            }
+            for i in range(ITEMS_PER_ENTITY)
+        ]
+
+
+def create_app(data, latency=0.0, failure_rate=0.0):
+    """aiohttp application serving `data`"""
+
+    routes = web.RouteTableDef()
+
+    def entity(request):
+        entity_id = int(request.match_info['entity_id'])
+        if entity_id not in data.portfolio.index:
+            raise web.HTTPNotFound()
+        return entity_id
+
+    @web.middleware
+    async def simulate_network(request, handler):
+        if latency:
+            await asyncio.sleep(latency)
+        if failure_rate and random.random() < failure_rate:
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    @routes.get('/entities')
+    async def entities(request):
+        since = request.query.get('changed_since', '')
+        server_time = datetime.now(timezone.utc).isoformat()   # taken first so no update slips between
+        changed = [
+            {'entity_id': int(entity_id), 'updated_at': updated}
+            for entity_id, updated in zip(data.portfolio.index, data.updated_at) if updated > since
+        ]
+        return web.json_response({'server_time': server_time, 'entities': changed})
+
+    @routes.get('/entities/{entity_id}/balances')
+    async def balances(request):
+        row = data.portfolio.loc[entity(request)]
+        return web.json_response({col: float(row[col]) for col in BALANCE_COLUMNS})
+
+    @routes.get('/entities/{entity_id}/financials')
+    async def financials(request):
+        row = data.portfolio.loc[entity(request)]
+        return web.json_response({'revenue': float(row['revenue']), 'cogs': float(row['cogs'])})
+
+    @routes.get('/entities/{entity_id}/open-items')
+    async def open_items(request):
+        item_type = request.query.get('type', 'AR').upper()
+        if item_type not in ('AR', 'AP'):
+            raise web.HTTPBadRequest(text="type must be AR or AP")
+        return web.json_response(data.open_items(entity(request), item_type))
+
+    app = web.Application(middlewares=[simulate_network])
+    app.add_routes(routes)
+    return app
+
+
+@asynccontextmanager
+async def run_mock_server(data, host='127.0.0.1', port=0, **app_kwargs):
+    """Run the mock ERP in the current event loop; yields its base URL"""
+
+    runner = web.AppRunner(create_app(data, **app_kwargs), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, backlog=1024)
+    await site.start()
+    try:
+        bound_port = runner.addresses[0][1]
+        yield f"http://{host}:{bound_port}"
+    finally:
+        await runner.cleanup()
+
+
+def create_mock_database(data, path):
+    """Write the mock data to a SQLite database for DatabaseERPConnector"""
+
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            DROP TABLE IF EXISTS entities; DROP TABLE IF EXISTS balances;
+            DROP TABLE IF EXISTS financials; DROP TABLE IF EXISTS open_items;
+            CREATE TABLE entities (entity_id INTEGER PRIMARY KEY, updated_at TEXT);
+            CREATE TABLE balances (entity_id INTEGER PRIMARY KEY, cash REAL, receivables REAL, inventory REAL,
+                                   other_ca REAL, payables REAL, short_debt REAL, other_cl REAL);
+            CREATE TABLE financials (entity_id INTEGER PRIMARY KEY, revenue REAL, cogs REAL);
+            CREATE TABLE open_items (entity_id INTEGER, type TEXT, item_id TEXT, amount REAL, due_date TEXT);
+            CREATE INDEX open_items_entity ON open_items (entity_id, type);
+        """)
+        ids = [int(e) for e in data.portfolio.index]
+        connection.executemany("INSERT INTO entities VALUES (?, ?)", zip(ids, data.updated_at))
+        connection.executemany(
+            f"INSERT INTO balances VALUES (?{', ?' * len(BALANCE_COLUMNS)})",
+            data.portfolio[list(BALANCE_COLUMNS)].itertuples(name=None),
+        )
+        connection.executemany("INSERT INTO financials VALUES (?, ?, ?)",
+                               data.portfolio[['revenue', 'cogs']].itertuples(name=None))
+        connection.executemany(
+            "INSERT INTO open_items VALUES (?, ?, ?, ?, ?)",
+            ((e, t, item['item_id'], item['amount'], item['due_date'])
+             for e in ids for t in ('AR', 'AP') for item in data.open_items(e, t)),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=10_000)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every request")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    data = MockERPData(args.entities)
+    web.run_app(create_app(data, args.latency, args.failure_rate), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+"""
+Parallel Execution (Shared Memory)
+
+Runs the vectorized portfolio calculations on several cores by splitting the
+entity axis into blocks. Input columns are copied once into
+multiprocessing.shared_memory blocks and outputs are allocated there too;
+workers receive only the block names, shapes and an entity range, attach to
+the same memory and write their slice of every output in place. Nothing
+entity-sized is pickled in either direction.
+
+Every calculation here is elementwise along the entity axis, so the result
+is identical whatever the number of workers. workers=1 (or a portfolio too
+small to be worth splitting) runs the same kernel in-process.
+
+    from parallel import parallel_analyze_portfolio
+    results = parallel_analyze_portfolio(portfolio, workers=16)
+"""
+
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from calculations import COST_OF_CAPITAL
+from portfolio import (
+    ASSUMPTIONS, INPUT_COLUMNS, assumption, calculate_portfolio_cash_flow_impact, calculate_portfolio_metrics,
+    calculate_sensitivity_grid, generate_portfolio_scenarios,
+)
+from sensitivity import compute_sensitivities
+from stress_testing import load_shock_library, replay_shocks, shock_paths
+
+MIN_BLOCK_SIZE = 5_000   # Smaller blocks cost more in task overhead than they save
+BLOCKS_PER_WORKER = 2    # Evens out stragglers without many extra tasks
+
+
+# ============================================================================
+# SHARED MEMORY
+# ============================================================================
+
+def _create(shape, dtype):
+    dtype = np.dtype(dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _share(arrays):
+    """Copy arrays into new shared memory blocks; returns (blocks, views, spec)"""
+
+    blocks, views, spec = [], {}, {}
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        block, views[name] = _create(array.shape, array.dtype)
+        views[name][...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, views, spec
+
+
+def _allocate(shapes):
+    """Uninitialized shared output arrays from {name: (shape, dtype)}"""
+
+    blocks, views, spec = [], {}, {}
+    for name, (shape, dtype) in shapes.items():
+        block, views[name] = _create(shape, dtype)
+        blocks.append(block)
+        spec[name] = (block.name, shape, np.dtype(dtype).str)
+    return blocks, views, spec
+
+
+def _attach(spec):
+    blocks, views = [], {}
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, views
+
+
+def _release(blocks, unlink=False):
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            gc.collect()  # a view is still referenced from a cycle; collect it and unmap
+            block.close()
+        if unlink:
+            block.unlink()
+
+
+def _run_block(kernel, input_spec, output_spec, start, stop, kwargs):
+    """Worker task: run `kernel` on entities [start, stop) and write outputs in place"""
+
+    in_blocks, inputs = _attach(input_spec)
+    out_blocks, outputs = _attach(output_spec)
+    result = None
+    try:
+        result = kernel({name: view[start:stop] for name, view in inputs.items()}, **kwargs)
+        for name, values in result.items():
+            outputs[name][start:stop] = values
+    finally:
+        del inputs, outputs, result
+        _release(in_blocks + out_blocks)
+    return stop - start
+
+
+# ============================================================================
+# EXECUTOR
+# ============================================================================
+
+def _blocks(n, workers, min_block_size):
+    n_blocks = max(1, min(workers * BLOCKS_PER_WORKER, n // max(min_block_size, 1)))
+    edges = np.linspace(0, n, n_blocks + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def run_entity_parallel(kernel, inputs, workers=None, min_block_size=MIN_BLOCK_SIZE, **kwargs):
+    """Apply `kernel` over the entity axis of `inputs` across worker processes
+
+    `kernel(arrays, **kwargs)` takes a dict of arrays sliced to a block of
+    entities and returns a dict of arrays whose first axis is that block.
+    It must be a module-level function (workers import it by name) and must
+    not mix entities. Returns the full outputs as a dict of arrays.
+    """
+
+    inputs = {name: np.asarray(values) for name, values in inputs.items()}
+    n = len(next(iter(inputs.values())))
+    workers = workers or os.cpu_count() or 1
+    ranges = _blocks(n, workers, min_block_size)
+
+    if workers == 1 or len(ranges) == 1:
+        return kernel(inputs, **kwargs)
+
+    # Output shapes and dtypes from one entity
+    probe = kernel({name: values[:1] for name, values in inputs.items()}, **kwargs)
+    shapes = {name: ((n, *np.shape(values)[1:]), np.asarray(values).dtype) for name, values in probe.items()}
+
+    in_blocks, in_views, input_spec = _share(inputs)
+    out_blocks, out_views, output_spec = _allocate(shapes)
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            futures = [pool.submit(_run_block, kernel, input_spec, output_spec, start, stop, kwargs)
+                       for start, stop in ranges]
+            for future in futures:
+                future.result()
+        results = {name: view.copy() for name, view in out_views.items()}
+    finally:
+        del in_views, out_views
+        _release(in_blocks + out_blocks, unlink=True)
+
+    return results
+
+
+# ============================================================================
+# KERNELS
+# ============================================================================
+
+def portfolio_kernel(arrays):
+    """Metrics, cash flow impact and scenarios for a block of entities"""
+
+    frame = pd.DataFrame(arrays)
+    metrics = calculate_portfolio_metrics(frame)
+    cash_flow = calculate_portfolio_cash_flow_impact(metrics, frame['revenue'], frame['cogs'],
+                                                     assumption(frame, 'ocf_margin'))
+    scenarios = generate_portfolio_scenarios(metrics, frame['revenue'], assumption(frame, 'cost_of_capital'))
+    return {col: table[col].to_numpy() for table in (metrics, cash_flow, scenarios) for col in table}
+
+
+def sensitivity_grid_kernel(arrays, dso_changes=None, dio_changes=None, cost_of_capital=COST_OF_CAPITAL):
+    rate = arrays.get('cost_of_capital', cost_of_capital)
+    return {'grid': calculate_sensitivity_grid(arrays['revenue'], dso_changes, dio_changes, rate)}
+
+
+def elasticity_kernel(arrays):
+    result = compute_sensitivities(arrays)
+    return {key: result[key] for key in ('input_values', 'values', 'derivatives', 'elasticities')}
+
+
+def stress_kernel(arrays, library=None):
+    """Shock replay for a block, reshaped to (entities, shocks) arrays"""
+
+    replay = replay_shocks(pd.DataFrame(arrays), library)
+    n = len(arrays['revenue'])
+    return {
+        'peak_requirement': replay['peak_requirement'].to_numpy().reshape(n, -1),
+        'peak_period': replay['peak_period'].to_numpy().reshape(n, -1),
+        'first_breach_period': replay['first_breach_period'].fillna(0).to_numpy(dtype=np.int64).reshape(n, -1),
+        'breached': replay['breached'].to_numpy().reshape(n, -1),
+    }
+
+
+def forecast_kernel(arrays, forecaster):
+    n = len(arrays['window'])
+    forecast = forecaster.predict_window(arrays['window'], arrays['static'])
+    return {metric: values.reshape(n, -1) for metric, values in forecast.items()}
+
+
+# ============================================================================
+# PARALLEL CALCULATIONS
+# ============================================================================
+
+def parallel_analyze_portfolio(portfolio, workers=None, **options):
+    """Parallel portfolio.analyze_portfolio; same columns and values"""
+
+    columns = [*INPUT_COLUMNS, *(col for col in ASSUMPTIONS if col in portfolio)]
+    results = run_entity_parallel(portfolio_kernel, {col: portfolio[col] for col in columns}, workers, **options)
+    identifiers = [col for col in portfolio.columns if col not in INPUT_COLUMNS]
+    return pd.concat([portfolio[identifiers], portfolio[list(INPUT_COLUMNS)],
+                      pd.DataFrame(results, index=portfolio.index)], axis=1)
+
+
+def parallel_sensitivity_grid(revenue, dso_changes=None, dio_changes=None, workers=None,
+                              cost_of_capital=COST_OF_CAPITAL, **options):
+    """Parallel portfolio.calculate_sensitivity_grid"""
+
+    arrays = {'revenue': np.asarray(revenue, dtype=float)}
+    if np.ndim(cost_of_capital):
+        arrays['cost_of_capital'] = np.asarray(cost_of_capital, dtype=float)  # per-entity rates go to shared memory
+    else:
+        options['cost_of_capital'] = cost_of_capital
+    return run_entity_parallel(sensitivity_grid_kernel, arrays, workers, dso_changes=dso_changes,
+                               dio_changes=dio_changes, **options)['grid']
+
+
+def parallel_sensitivities(portfolio, workers=None, **options):
+    """Parallel sensitivity.compute_sensitivities; same dict layout"""
+
+    columns = [col for col in ('cost_of_capital', 'ocf_margin') if col in portfolio]
+    arrays = {col: np.asarray(portfolio[col], dtype=float) for col in (*INPUT_COLUMNS, *columns)}
+    results = run_entity_parallel(elasticity_kernel, arrays, workers, **options)
+
+    labels = compute_sensitivities({col: arrays[col][:1] for col in arrays})
+    return {'outputs': labels['outputs'], 'inputs': labels['inputs'], **results}
+
+
+def parallel_replay_shocks(portfolio, library=None, workers=None, **options):
+    """Parallel stress_testing.replay_shocks; same long-format frame"""
+
+    library = library if library is not None else load_shock_library()
+    columns = [*INPUT_COLUMNS, *(col for col in ('credit_line', *ASSUMPTIONS) if col in portfolio)]
+    results = run_entity_parallel(stress_kernel, {col: np.asarray(portfolio[col], dtype=float) for col in columns},
+                                  workers, library=library, **options)
+
+    names, _ = shock_paths(library)
+    n, n_shocks = results['peak_requirement'].shape
+    first_breach = pd.array(results['first_breach_period'].ravel(), dtype='Int64')
+    first_breach[~results['breached'].ravel()] = pd.NA
+
+    return pd.DataFrame({
+        'entity_id': np.repeat(np.asarray(portfolio.get('entity_id', portfolio.index)), n_shocks),
+        'shock': np.tile(names, n),
+        'peak_requirement': results['peak_requirement'].ravel(),
+        'peak_period': results['peak_period'].ravel(),
+        'first_breach_period': first_breach,
+        'breached': results['breached'].ravel(),
+    })
+
+
+def parallel_predict(forecaster, history, workers=None, **options):
+    """Parallel WorkingCapitalForecaster.predict; same long-format frame
+
+    The history is pivoted once in the parent; workers score blocks of the
+    (entities, metrics, lags) window with the fitted models.
+    """
+
+    entities, window, static = forecaster.inference_inputs(history)
+    results = run_entity_parallel(forecast_kernel, {'window': window, 'static': static},
+                                  workers, forecaster=forecaster, **options)
+
+    forecast = pd.DataFrame({
+        'entity_id': np.repeat(entities, forecaster.horizon),
+        'horizon': np.tile(np.arange(1, forecaster.horizon + 1), len(entities)),
+    })
+    for metric, values in results.items():
+        forecast[metric] = values.ravel()
+    return forecast
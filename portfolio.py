@@ -0,0 +1,100 @@
+"""
+Portfolio (Vectorized) Calculations
+
+Runs the formulas in calculations.py over a whole portfolio: every input is
+a column of a DataFrame with one row per entity, passed to the shared
+functions as numpy arrays, so the portfolio is computed in a handful of
+numpy operations instead of one Python call per entity.
+
+Zero denominators produce 0, as for a single company. Optional
+'cost_of_capital' and 'ocf_margin' columns override the default assumptions
+per entity.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculations import (
+    COST_OF_CAPITAL, OCF_MARGIN, calculate_cash_flow_impact, calculate_working_capital_metrics,
+    generate_scenario_analysis,
+)
+
+INPUT_COLUMNS = (
+    'revenue', 'cogs', 'cash', 'receivables', 'inventory',
+    'other_ca', 'payables', 'short_debt', 'other_cl',
+)
+
+
+# DSO / DIO changes (days) on the axes of the sensitivity grid
+GRID_DAY_CHANGES = np.linspace(-30, 30, 7)
+
+ASSUMPTIONS = {
+    'cost_of_capital': COST_OF_CAPITAL,
+    'ocf_margin': OCF_MARGIN,
+}
+
+
+def _column(portfolio, name):
+    return np.asarray(portfolio[name], dtype=float)
+
+
+def assumption(portfolio, name):
+    """Per-entity assumption column if the portfolio has one, else the default rate"""
+    return _column(portfolio, name) if name in portfolio else ASSUMPTIONS[name]
+
+
+# ============================================================================
+# CALCULATIONS
+# ============================================================================
+
+def calculate_portfolio_metrics(portfolio):
+    """Calculate working capital metrics for every entity"""
+
+    metrics = calculate_working_capital_metrics(*(_column(portfolio, col) for col in INPUT_COLUMNS))
+    return pd.DataFrame(metrics, index=portfolio.index)
+
+
+def calculate_portfolio_cash_flow_impact(metrics, revenue, cogs, ocf_margin=OCF_MARGIN):
+    """Calculate cash flow impact for every entity"""
+
+    cash_flow = calculate_cash_flow_impact(
+        {col: metrics[col].to_numpy() for col in ('dso', 'dio', 'dpo')},
+        np.asarray(revenue, dtype=float), np.asarray(cogs, dtype=float), ocf_margin,
+    )
+    return pd.DataFrame(cash_flow, index=metrics.index)
+
+
+def generate_portfolio_scenarios(metrics, revenue, cost_of_capital=COST_OF_CAPITAL):
+    """Generate best/worst case scenarios for every entity"""
+
+    base = {col: metrics[col].to_numpy() for col in ('dso', 'dio', 'dpo', 'ccc')}
+    scenarios = generate_scenario_analysis(base, np.asarray(revenue, dtype=float), None, cost_of_capital)
+
+    return pd.DataFrame({
+        f"{case.lower()}_{key}": value
+        for case in ('Best', 'Worst') for key, value in scenarios[case].items()
+    }, index=metrics.index)
+
+
+def calculate_sensitivity_grid(revenue, dso_changes=None, dio_changes=None, cost_of_capital=COST_OF_CAPITAL):
+    """Cash impact of DSO x DIO day changes: (entities x DIO changes x DSO changes)"""
+
+    dso_changes = GRID_DAY_CHANGES if dso_changes is None else np.asarray(dso_changes, dtype=float)
+    dio_changes = GRID_DAY_CHANGES if dio_changes is None else np.asarray(dio_changes, dtype=float)
+
+    ccc_change = dio_changes[:, None] + dso_changes[None, :]
+    revenue = np.atleast_1d(np.asarray(revenue, dtype=float))
+    rate = np.broadcast_to(np.asarray(cost_of_capital, dtype=float), revenue.shape)
+    return (ccc_change / 365)[None] * revenue[:, None, None] * rate[:, None, None]
+
+
+def analyze_portfolio(portfolio):
+    """Metrics, cash flow impact and scenarios for every entity in one table"""
+
+    metrics = calculate_portfolio_metrics(portfolio)
+    cash_flow = calculate_portfolio_cash_flow_impact(metrics, portfolio['revenue'], portfolio['cogs'],
+                                                     assumption(portfolio, 'ocf_margin'))
+    scenarios = generate_portfolio_scenarios(metrics, portfolio['revenue'], assumption(portfolio, 'cost_of_capital'))
+
+    identifiers = [col for col in portfolio.columns if col not in INPUT_COLUMNS]
+    return pd.concat([portfolio[identifiers], portfolio[list(INPUT_COLUMNS)], metrics, cash_flow, scenarios], axis=1)
@@ -0,0 +1,125 @@
+"""
+Portfolio Grid
+
+Server-side paging, sorting and filtering over a typed portfolio table. The
+full table stays as numeric columns on the server; only the requested page is
+formatted (style_portfolio_page) and sent to the browser, so the payload is
+bounded by the page size no matter how many entities the portfolio holds.
+
+Status columns apply the same thresholds as generate_insights in calculations.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from charts import COLORS
+from export import KEY_COLUMNS
+
+# Column: (danger condition, warning condition, success condition) as used by generate_insights
+INSIGHT_THRESHOLDS = {
+    'current_ratio': (lambda v: v < 1.0, lambda v: v < 1.5, lambda v: v >= 1.5),
+    'ccc': (lambda v: np.zeros(len(v), dtype=bool), lambda v: v > 90, lambda v: v < 0),
+    'fcf_impact_pct': (lambda v: np.zeros(len(v), dtype=bool), lambda v: v > 50, lambda v: np.zeros(len(v), dtype=bool)),
+}
+
+
+def insight_status(column, values):
+    """Vectorized 'danger' / 'warning' / 'success' / '' status per value"""
+
+    danger, warning, success = INSIGHT_THRESHOLDS[column]
+    values = np.asarray(values, dtype=float)
+    return np.select([danger(values), warning(values), success(values)],
+                     ['danger', 'warning', 'success'], default='')
+
+
+PORTFOLIO_FORMATS = {
+    'revenue': '{:,.0f}',
+    'cogs': '{:,.0f}',
+    'net_wc': '{:,.0f}',
+    'current_ratio': '{:.2f}',
+    'quick_ratio': '{:.2f}',
+    'dso': '{:.0f}',
+    'dio': '{:.0f}',
+    'dpo': '{:.0f}',
+    'ccc': '{:.0f}',
+    'net_cash_tied': '{:,.0f}',
+    'fcf_impact_pct': '{:.1f}%',
+    'best_impact': '{:,.0f}',
+}
+
+
+class PortfolioGrid:
+    """Sorted, filtered, paged view over a portfolio DataFrame
+
+    Sort orders are computed once per column and cached as int arrays, so
+    re-sorting or paging through 50k+ rows is an index lookup rather than a
+    DataFrame sort.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self._orders = {}
+
+    def _order(self, column):
+        if column not in self._orders:
+            self._orders[column] = np.argsort(self.frame[column].to_numpy(), kind='stable').astype(np.int64)
+        return self._orders[column]
+
+    def mask(self, ranges=None, categories=None, search=None, search_column='entity_id'):
+        """Boolean row mask from numeric ranges, category selections and a text search"""
+
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, (low, high) in (ranges or {}).items():
+            values = self.frame[column].to_numpy()
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        for column, selected in (categories or {}).items():
+            if selected:
+                mask &= self.frame[column].isin(selected).to_numpy()
+        if search:
+            mask &= self.frame[search_column].astype(str).str.contains(search, case=False, regex=False).to_numpy()
+        return mask
+
+    def query(self, sort_by=None, ascending=True, page=0, page_size=100, **filters):
+        """Return (page DataFrame, matching row count, page count)"""
+
+        mask = self.mask(**filters)
+        if sort_by is None:
+            rows = np.flatnonzero(mask)
+        else:
+            order = self._order(sort_by)
+            order = order if ascending else order[::-1]
+            rows = order[mask[order]]
+
+        total = len(rows)
+        pages = max(1, -(-total // page_size))
+        page = min(max(page, 0), pages - 1)
+        window = rows[page * page_size:(page + 1) * page_size]
+
+        return self.frame.iloc[window], total, pages
+
+
+def style_portfolio_page(page):
+    """Format and color only the rows being sent to the browser"""
+
+    status_colors = {
+        'danger': f"background-color: {COLORS['danger']}; color: white",
+        'warning': f"background-color: {COLORS['warning']}; color: black",
+        'success': f"background-color: {COLORS['success']}; color: white",
+        '': '',
+    }
+    # Entity keys always show (numeric ids included), then formatted metrics and any text columns
+    keys = [col for col in KEY_COLUMNS if col in page]
+    columns = keys + [col for col in page.columns if col not in keys and
+                      (col in PORTFOLIO_FORMATS or not pd.api.types.is_numeric_dtype(page[col]))]
+    styler = page[columns].style.format({col: fmt for col, fmt in PORTFOLIO_FORMATS.items() if col in columns})
+
+    for column in INSIGHT_THRESHOLDS:
+        if column in columns:
+            styler = styler.apply(
+                lambda values, col=column: [status_colors[s] for s in insight_status(col, values)],
+                subset=[column],
+            )
+    return styler
@@ -0,0 +1,274 @@
+"""
+Batch CFO Reports
+
+Renders a static HTML pack per entity (metric cards, CCC waterfall, forecast,
+scenarios, insights) from the same figure builders and insight logic as the
+live dashboard in app.py, for thousands of entities at month-end.
+
+Reports are rendered in a process pool, a chunk of entities per task. The
+stylesheet and Plotly JS are written once under `assets/` and referenced by
+every report, so each file carries only its own figure data.
+
+    python -m reports portfolio.parquet reports/ --workers 8
+"""
+
+import argparse
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from calculations import (
+    calculate_cash_flow_impact, calculate_working_capital_metrics, generate_insights, generate_scenario_analysis,
+)
+from charts import BRANDING, COLORS, create_ccc_waterfall, create_trend_forecast
+from export import read_table
+from portfolio import ASSUMPTIONS, INPUT_COLUMNS
+
+ASSET_DIR = 'assets'
+PLOTLY_JS = 'plotly.min.js'
+REPORT_CSS = 'report.css'
+
+INSIGHT_COLORS = {
+    'danger': COLORS['danger'],
+    'warning': COLORS['warning'],
+    'success': COLORS['success'],
+    'info': COLORS['accent_gold'],
+}
+
+STYLESHEET = f"""
+body {{ background: {COLORS['bg_dark']}; color: {COLORS['text_primary']}; font-family: Helvetica, Arial, sans-serif; margin: 2rem; }}
+h1 {{ color: {COLORS['accent_gold']}; margin-bottom: 0; }}
+h2 {{ color: {COLORS['accent_gold']}; border-bottom: 1px solid {COLORS['medium_blue']}; padding-bottom: .3rem; }}
+.subtitle {{ color: {COLORS['text_secondary']}; margin-top: .2rem; }}
+.cards {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(170px, 1fr)); gap: 1rem; }}
+.metric-card {{ background: {COLORS['card_bg']}; border-left: 4px solid {COLORS['accent_gold']}; border-radius: 8px; padding: 1rem; }}
+.metric-label {{ color: {COLORS['text_secondary']}; font-size: .85rem; text-transform: uppercase; }}
+.metric-value {{ font-size: 1.6rem; font-weight: bold; }}
+.charts {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(480px, 1fr)); gap: 1rem; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ padding: .5rem .8rem; text-align: right; border-bottom: 1px solid {COLORS['medium_blue']}; }}
+th:first-child, td:first-child {{ text-align: left; }}
+.insight {{ background: {COLORS['card_bg']}; border-left: 4px solid; border-radius: 6px; padding: .8rem 1rem; margin-bottom: .8rem; }}
+.insight h3 {{ margin: 0 0 .3rem 0; font-size: 1rem; }}
+footer {{ color: {COLORS['text_secondary']}; font-size: .8rem; margin-top: 2rem; }}
+"""
+
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def write_assets(out_dir):
+    """Write the shared stylesheet and Plotly JS once"""
+
+    assets = Path(out_dir) / ASSET_DIR
+    assets.mkdir(parents=True, exist_ok=True)
+    (assets / REPORT_CSS).write_text(STYLESHEET, encoding='utf-8')
+    (assets / PLOTLY_JS).write_text(get_plotlyjs(), encoding='utf-8')
+    return assets
+
+
+def _card(label, value):
+    return (f'<div class="metric-card"><div class="metric-label">{label}</div>'
+            f'<div class="metric-value">{value}</div></div>')
+
+
+def _figure(fig, div_id):
+    return fig.to_html(full_html=False, include_plotlyjs=False, div_id=div_id, config={'displayModeBar': False})
+
+
+def _missing(value):
+    return value is None or (np.ndim(value) == 0 and pd.isna(value)) or value == ''
+
+
+def _entity_id(entity):
+    """The row's entity_id, or None; whole-number floats (CSV ids with blanks) as int"""
+
+    entity_id = entity.get('entity_id')
+    if _missing(entity_id):
+        return None
+    if isinstance(entity_id, float) and entity_id.is_integer():
+        return int(entity_id)
+    return entity_id
+
+
+def report_title(entity, position=0):
+    """Entity name, else 'Entity <id>', else the row number"""
+
+    if not _missing(entity.get('name')):
+        return str(entity['name'])
+    if _entity_id(entity) is not None:
+        return f"Entity {_entity_id(entity)}"
+    return f"Row {position + 1}"
+
+
+def render_report(entity, as_of=None, position=0):
+    """HTML report for one entity (a mapping with the nine input columns)
+
+    Optional 'cost_of_capital' / 'ocf_margin' values override the default
+    assumptions, as for analyze_portfolio.
+    """
+
+    revenue, cogs = entity['revenue'], entity['cogs']
+    metrics = calculate_working_capital_metrics(*(entity[col] for col in INPUT_COLUMNS))
+    cash_flow = calculate_cash_flow_impact(metrics, revenue, cogs,
+                                           entity.get('ocf_margin', ASSUMPTIONS['ocf_margin']))
+    scenarios = generate_scenario_analysis(metrics, revenue, cogs,
+                                           entity.get('cost_of_capital', ASSUMPTIONS['cost_of_capital']))
+    insights = generate_insights(metrics, cash_flow, scenarios)
+
+    name = html.escape(report_title(entity, position))
+    subtitle = ' · '.join(html.escape(str(part)) for part in (entity.get('segment'), as_of) if not _missing(part))
+
+    cards = ''.join([
+        _card("Net Working Capital", f"₹{metrics['net_wc'] / 1_000_000:.1f}M"),
+        _card("Current Ratio", f"{metrics['current_ratio']:.2f}"),
+        _card("Quick Ratio", f"{metrics['quick_ratio']:.2f}"),
+        _card("Cash Conversion Cycle", f"{metrics['ccc']:.1f} days"),
+        _card("DSO / DIO / DPO", f"{metrics['dso']:.0f} / {metrics['dio']:.0f} / {metrics['dpo']:.0f}"),
+        _card("FCF Tied in WC", f"{cash_flow['fcf_impact_pct']:.1f}%"),
+    ])
+
+    scenario_rows = ''.join(
+        f"<tr><td>{label}</td><td>{scenarios[label]['dso']:.1f}</td><td>{scenarios[label]['dio']:.1f}</td>"
+        f"<td>{scenarios[label]['dpo']:.1f}</td><td>{scenarios[label]['ccc']:.1f}</td>"
+        f"<td>{'—' if label == 'Base' else '₹{:,.0f}'.format(scenarios[label]['impact'])}</td></tr>"
+        for label in ('Base', 'Best', 'Worst')
+    )
+
+    insight_html = ''.join(
+        f'<div class="insight" style="border-color:{INSIGHT_COLORS[item["type"]]};">'
+        f'<h3>{html.escape(item["title"])}</h3><div>{html.escape(item["message"])}</div></div>'
+        for item in insights
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{name} | Working Capital Report</title>
+<link rel="stylesheet" href="{ASSET_DIR}/{REPORT_CSS}">
+<script src="{ASSET_DIR}/{PLOTLY_JS}"></script>
+</head>
+<body>
+<h1>{name}</h1>
+<p class="subtitle">{subtitle}</p>
+<h2>Key Metrics</h2>
+<div class="cards">{cards}</div>
+<h2>Operating Cycle &amp; Forecast</h2>
+<div class="charts">
+{_figure(create_ccc_waterfall(metrics['dso'], metrics['dio'], metrics['dpo']), 'ccc-waterfall')}
+{_figure(create_trend_forecast(revenue, cogs, metrics), 'wc-forecast')}
+</div>
+<h2>Scenarios</h2>
+<table>
+<tr><th>Scenario</th><th>DSO</th><th>DIO</th><th>DPO</th><th>CCC</th><th>Cash Impact</th></tr>
+{scenario_rows}
+</table>
+<h2>Insights</h2>
+{insight_html}
+<footer>{html.escape(BRANDING['name'])} · {html.escape(BRANDING['instructor'])}</footer>
+</body>
+</html>
+"""
+
+
+def report_filename(entity, position):
+    """entity_<id>.html, or row_<position>.html when the row has no entity_id"""
+
+    entity_id = _entity_id(entity)
+    return f"row_{position}.html" if entity_id is None else f"entity_{entity_id}.html"
+
+
+def _render_chunk(rows, out_dir, as_of):
+    """Render and write a chunk of (position, entity) rows; returns per-report seconds"""
+
+    latencies = []
+    for position, entity in rows:
+        start = time.perf_counter()
+        page = render_report(entity, as_of, position)
+        (Path(out_dir) / report_filename(entity, position)).write_text(page, encoding='utf-8')
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# ============================================================================
+# BATCH GENERATION
+# ============================================================================
+
+def generate_reports(portfolio, out_dir, workers=None, chunk_size=50, as_of=None):
+    """Render one report per portfolio row into `out_dir` using a process pool
+
+    Reports are named by entity_id, or by row position for rows without
+    one. Returns a dict with the report count, wall time, throughput and
+    per-report latency percentiles.
+    """
+
+    out_dir = Path(out_dir)
+    start = time.perf_counter()
+    write_assets(out_dir)
+
+    if 'entity_id' in portfolio and portfolio['entity_id'].dropna().duplicated().any():
+        raise ValueError("entity_id must be unique: reports are written to one file per entity")
+
+    entities = list(enumerate(portfolio.to_dict('records')))
+    chunks = [entities[i:i + chunk_size] for i in range(0, len(entities), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        results = [_render_chunk(chunk, out_dir, as_of) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_chunk, chunks, [out_dir] * len(chunks), [as_of] * len(chunks)))
+
+    index_rows = ''.join(
+        f'<li><a href="{html.escape(report_filename(entity, position))}">'
+        f'{html.escape(report_title(entity, position))}</a></li>'
+        for position, entity in entities
+    )
+    (out_dir / 'index.html').write_text(
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Working Capital Reports</title>'
+        f'<link rel="stylesheet" href="{ASSET_DIR}/{REPORT_CSS}"></head>'
+        f'<body><h1>Working Capital Reports</h1><ul>{index_rows}</ul></body></html>',
+        encoding='utf-8',
+    )
+
+    elapsed = time.perf_counter() - start
+    latencies = np.concatenate([np.asarray(r) for r in results]) if results else np.zeros(0)
+    return {
+        'reports': len(entities),
+        'workers': workers,
+        'seconds': elapsed,
+        'reports_per_second': len(entities) / elapsed if elapsed else 0.0,
+        'latency_p50_ms': float(np.percentile(latencies, 50) * 1e3) if len(latencies) else 0.0,
+        'latency_p95_ms': float(np.percentile(latencies, 95) * 1e3) if len(latencies) else 0.0,
+        'latency_max_ms': float(latencies.max() * 1e3) if len(latencies) else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('portfolio', help="portfolio CSV or Parquet with the nine input columns; optional "
+                                          "entity_id, name, segment, cost_of_capital and ocf_margin")
+    parser.add_argument('output', help="output directory")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=50)
+    parser.add_argument('--as-of', help="reporting date printed on every report")
+    args = parser.parse_args(argv)
+
+    stats = generate_reports(read_table(args.portfolio), args.output, args.workers, args.chunk_size, args.as_of)
+    print(f"{stats['reports']:,} reports in {stats['seconds']:.1f}s with {stats['workers']} workers "
+          f"({stats['reports_per_second']:.1f}/s; p50 {stats['latency_p50_ms']:.0f}ms, "
+          f"p95 {stats['latency_p95_ms']:.0f}ms, max {stats['latency_max_ms']:.0f}ms per report)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
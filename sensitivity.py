@@ -0,0 +1,201 @@
+"""
+Analytic Sensitivities and Elasticities
+
+Exact partial derivatives of every output of calculate_working_capital_metrics,
+calculate_cash_flow_impact and generate_scenario_analysis with respect to the
+nine sidebar inputs plus the cost of capital and OCF margin assumptions.
+
+Derivatives come from forward-mode automatic differentiation: each input is a
+vectorized dual number carrying its value (one per entity) and its gradient
+with respect to all inputs, and the calculation functions in calculations.py
+are evaluated on those duals. One pass yields the full Jacobian for a whole
+portfolio, with no finite-difference reruns and no second copy of the
+formulas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from calculations import (
+    COST_OF_CAPITAL, OCF_MARGIN, calculate_cash_flow_impact, calculate_working_capital_metrics,
+    generate_scenario_analysis,
+)
+from portfolio import INPUT_COLUMNS
+
+SENSITIVITY_INPUTS = INPUT_COLUMNS + ('cost_of_capital', 'ocf_margin')
+
+INPUT_LABELS = {
+    'revenue': 'Annual Revenue',
+    'cogs': 'Annual COGS',
+    'cash': 'Cash',
+    'receivables': 'Accounts Receivable',
+    'inventory': 'Inventory',
+    'other_ca': 'Other Current Assets',
+    'payables': 'Accounts Payable',
+    'short_debt': 'Short-Term Debt',
+    'other_cl': 'Other Current Liabilities',
+    'cost_of_capital': 'Cost of Capital',
+    'ocf_margin': 'OCF Margin',
+}
+
+RATE_INPUTS = ('cost_of_capital', 'ocf_margin')   # Labelled with their value, e.g. 'Cost of Capital (8%)'
+
+
+def input_label(name, value):
+    if name in RATE_INPUTS:
+        return f"{INPUT_LABELS[name]} ({value * 100:g}%)"
+    return INPUT_LABELS[name]
+
+
+# ============================================================================
+# DUAL NUMBERS
+# ============================================================================
+
+class Dual:
+    """Vectorized forward-mode dual number: value (N,) and gradient (N, K)
+
+    Truthiness is always True and dividing by a zero value gives 0 with a zero
+    gradient. Together these reproduce the safe_div guards in
+    calculations.py elementwise, so mixed portfolios with some zero denominators still
+    evaluate in one pass.
+    """
+
+    __slots__ = ('val', 'grad')
+    __array_ufunc__ = None  # make numpy scalars defer to our reflected operators
+
+    def __init__(self, val, grad):
+        self.val = val
+        self.grad = grad
+
+    @staticmethod
+    def _lift(other, like):
+        if isinstance(other, Dual):
+            return other
+        val = np.broadcast_to(np.asarray(other, dtype=float), like.val.shape)
+        return Dual(val, np.zeros_like(like.grad))
+
+    def __add__(self, other):
+        other = self._lift(other, self)
+        return Dual(self.val + other.val, self.grad + other.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._lift(other, self)
+        return Dual(self.val - other.val, self.grad - other.grad)
+
+    def __rsub__(self, other):
+        return self._lift(other, self) - self
+
+    def __neg__(self):
+        return Dual(-self.val, -self.grad)
+
+    def __mul__(self, other):
+        other = self._lift(other, self)
+        return Dual(self.val * other.val,
+                    self.grad * other.val[..., None] + other.grad * self.val[..., None])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._lift(other, self)
+        nonzero = other.val != 0
+        den = np.where(nonzero, other.val, 1.0)
+        val = np.where(nonzero, self.val / den, 0.0)
+        grad = (self.grad - val[..., None] * other.grad) / den[..., None]
+        return Dual(val, np.where(nonzero[..., None], grad, 0.0))
+
+    def __rtruediv__(self, other):
+        return self._lift(other, self) / self
+
+    def __pow__(self, exponent):
+        return Dual(self.val ** exponent, exponent * (self.val ** (exponent - 1))[..., None] * self.grad)
+
+    def __bool__(self):
+        return True
+
+
+def seed_inputs(inputs):
+    """Turn a mapping of input arrays into duals seeded with the identity Jacobian"""
+
+    values = [np.atleast_1d(np.asarray(inputs[name], dtype=float)) for name in SENSITIVITY_INPUTS]
+    n = max(len(v) for v in values)
+    k = len(SENSITIVITY_INPUTS)
+
+    seeded = {}
+    for j, (name, value) in enumerate(zip(SENSITIVITY_INPUTS, values)):
+        grad = np.zeros((n, k))
+        grad[:, j] = 1.0
+        seeded[name] = Dual(np.broadcast_to(value, (n,)).copy(), grad)
+    return seeded
+
+
+# ============================================================================
+# SENSITIVITIES
+# ============================================================================
+
+def compute_sensitivities(inputs, cycle_override=None):
+    """Values, Jacobian and elasticities of every output for one or many entities
+
+    `inputs` maps each name in SENSITIVITY_INPUTS to a scalar or per-entity
+    array (a portfolio DataFrame works); cost_of_capital and ocf_margin
+    default to the app's assumptions. `cycle_override` optionally fixes
+    DSO/DIO/DPO (e.g. panel average-balance days), which then have zero
+    derivatives. Returns a dict with 'outputs', 'inputs', 'values' (N x O),
+    'derivatives' and 'elasticities' (N x O x K).
+    """
+
+    inputs = {'cost_of_capital': COST_OF_CAPITAL, 'ocf_margin': OCF_MARGIN,
+              **{name: inputs[name] for name in SENSITIVITY_INPUTS if name in inputs}}
+    x = seed_inputs(inputs)
+
+    metrics = calculate_working_capital_metrics(*(x[name] for name in INPUT_COLUMNS))
+    if cycle_override is not None:
+        metrics.update({key: Dual._lift(cycle_override[key], x['revenue']) for key in ('dso', 'dio', 'dpo')})
+        metrics['ccc'] = metrics['dso'] + metrics['dio'] - metrics['dpo']
+    cash_flow = calculate_cash_flow_impact(metrics, x['revenue'], x['cogs'], ocf_margin=x['ocf_margin'])
+    scenarios = generate_scenario_analysis(metrics, x['revenue'], x['cogs'],
+                                           cost_of_capital=x['cost_of_capital'])
+
+    outputs = {**metrics, **cash_flow}
+    for case in ('Best', 'Worst'):
+        outputs.update({f"{case.lower()}_{key}": value for key, value in scenarios[case].items()})
+
+    names = list(outputs)
+    values = np.column_stack([outputs[name].val for name in names])
+    derivatives = np.stack([outputs[name].grad for name in names], axis=1)
+
+    x_values = np.column_stack([x[name].val for name in SENSITIVITY_INPUTS])
+    scale = x_values[:, None, :]
+    elasticities = np.zeros_like(derivatives)
+    np.divide(derivatives * scale, values[..., None], out=elasticities, where=values[..., None] != 0)
+
+    return {
+        'outputs': names,
+        'inputs': list(SENSITIVITY_INPUTS),
+        'input_values': x_values,
+        'values': values,
+        'derivatives': derivatives,
+        'elasticities': elasticities,
+    }
+
+
+def sensitivity_table(result, output, entity=0, shock=0.10):
+    """Tornado data for one output: swing from a ±`shock` relative change in each input"""
+
+    o = result['outputs'].index(output)
+    derivative = result['derivatives'][entity, o]
+    x = result['input_values'][entity]
+
+    swing = derivative * x * shock
+    table = pd.DataFrame({
+        'input': result['inputs'],
+        'label': [input_label(name, value) for name, value in zip(result['inputs'], x)],
+        'value': x,
+        'derivative': derivative,
+        'elasticity': result['elasticities'][entity, o],
+        'low': -swing,
+        'high': swing,
+    })
+
+    return table.reindex(table['high'].abs().sort_values().index).reset_index(drop=True)
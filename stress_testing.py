@@ -0,0 +1,210 @@
+"""
+Historical Stress-Test Replay
+
+Replays named historical shocks across a whole portfolio. A shock is a set of
+quarterly paths: DSO / DIO / DPO and revenue as multipliers on each entity's
+current values, and cost of capital as an absolute annual rate.
+
+For every (entity, shock, period) the replay computes the incremental cash
+requirement versus steady state:
+
+    working capital build-up  (net cash tied under shock - today's)
+  + cumulative financing cost (tied cash at the shock rate vs the entity's rate)
+  + cumulative lost operating cash flow from the revenue drop
+
+and flags a liquidity breach in the first period the requirement exceeds the
+entity's cash (plus any undrawn 'credit_line'). The entity's rate and OCF
+margin come from optional 'cost_of_capital' / 'ocf_margin' columns, or the
+default assumptions.
+
+Shocks are loaded from JSON or CSV files; the built-in library lives in
+shocks/. See load_shock_library for the file formats.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from portfolio import assumption, calculate_portfolio_metrics
+
+SHOCK_DIR = Path(__file__).parent / 'shocks'
+
+PERIODS_PER_YEAR = 4
+
+MULTIPLIERS = ('dso', 'dio', 'dpo', 'revenue')
+
+
+# ============================================================================
+# SHOCK LIBRARY
+# ============================================================================
+
+def _validate_shock(shock, source):
+    """Fill defaults and check that every path has the same length"""
+
+    if 'name' not in shock:
+        raise ValueError(f"{source}: shock is missing a 'name'")
+
+    lengths = {len(shock[key]) for key in MULTIPLIERS + ('cost_of_capital',) if key in shock}
+    if not lengths or lengths == {0}:
+        raise ValueError(f"{source}: shock '{shock['name']}' has no paths "
+                         f"(expected one or more of {', '.join(MULTIPLIERS + ('cost_of_capital',))})")
+    if len(lengths) != 1:
+        raise ValueError(f"{source}: paths for shock '{shock['name']}' have different lengths")
+    n = lengths.pop()
+
+    validated = {'name': shock['name'], 'description': shock.get('description', '')}
+    for key in MULTIPLIERS:
+        validated[key] = [float(v) for v in shock.get(key, [1.0] * n)]
+    validated['cost_of_capital'] = [float(v) for v in shock.get('cost_of_capital', [np.nan] * n)]  # NaN: entity's own rate
+
+    return validated
+
+
+def _read_shock_file(path):
+    if path.suffix == '.json':
+        data = json.loads(path.read_text())
+        return data if isinstance(data, list) else [data]
+
+    if path.suffix == '.csv':
+        # Long format: name, period, dso, dio, dpo, revenue, cost_of_capital; optional description
+        frame = pd.read_csv(path).sort_values(['name', 'period'])
+        shocks = []
+        for name, group in frame.groupby('name', sort=False):
+            shock = {'name': name}
+            shock.update({col: group[col].tolist() for col in group.columns
+                          if col in MULTIPLIERS + ('cost_of_capital',)})
+            if 'description' in group:
+                descriptions = group['description'].dropna()
+                shock['description'] = str(descriptions.iloc[0]) if len(descriptions) else ''
+            shocks.append(shock)
+        return shocks
+
+    raise ValueError(f"{path}: unsupported shock file type (use .json or .csv)")
+
+
+def load_shock_library(*paths, builtin=True):
+    """Load the built-in shocks/ library plus shocks from extra files or directories
+
+    Extra shocks are merged over the built-ins; one with the same name
+    replaces the built-in shock. builtin=False loads only `paths`.
+
+    JSON files hold one shock object, or a list of them, with a 'name', an
+    optional 'description' and one list per path. CSV files hold one row per
+    (name, period). Missing multiplier paths default to 1.0 and a missing
+    cost_of_capital path leaves each entity's own rate unchanged.
+    """
+
+    files = []
+    for path in map(Path, ((SHOCK_DIR,) if builtin else ()) + paths):
+        files.extend(sorted(path.glob('*.json')) + sorted(path.glob('*.csv')) if path.is_dir() else [path])
+
+    library = {}
+    for path in files:
+        for shock in _read_shock_file(path):
+            shock = _validate_shock(shock, path)
+            library[shock['name']] = shock
+
+    return library
+
+
+def shock_paths(library):
+    """Stack a library into (shocks x periods) arrays, holding each path's last value"""
+
+    names = list(library)
+    n_periods = max(len(shock['dso']) for shock in library.values())
+
+    paths = {}
+    for key in MULTIPLIERS + ('cost_of_capital',):
+        rows = [library[name][key] for name in names]
+        paths[key] = np.array([row + [row[-1]] * (n_periods - len(row)) for row in rows])
+
+    return names, paths
+
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+def _replay_chunk(revenue, cogs, dso, dio, dpo, liquidity, rate, ocf_margin, paths):
+    """Cash requirement cube for one block of entities: (entities x shocks x periods)"""
+
+    e = (slice(None), None, None)  # broadcast entity vectors over shocks and periods
+    rev_t = revenue[e] * paths['revenue']
+    cogs_t = cogs[e] * paths['revenue']
+
+    tied_base = (dso * revenue + (dio - dpo) * cogs) / 365
+    tied_t = (dso[e] * paths['dso'] * rev_t + (dio[e] * paths['dio'] - dpo[e] * paths['dpo']) * cogs_t) / 365
+
+    rate_t = np.where(np.isnan(paths['cost_of_capital']), rate[e], paths['cost_of_capital'])
+    financing = (tied_t * rate_t - (tied_base * rate)[e]) / PERIODS_PER_YEAR
+    lost_ocf = (revenue[e] - rev_t) * ocf_margin[e] / PERIODS_PER_YEAR
+
+    requirement = (tied_t - tied_base[e]) + np.cumsum(financing + lost_ocf, axis=2)
+    breached = requirement > liquidity[e]
+
+    return requirement, breached
+
+
+def replay_shocks(portfolio, library=None, chunk_size=20_000):
+    """Apply every shock to every entity; one row per (entity, shock)
+
+    Columns: peak_requirement, peak_period, first_breach_period (1-based,
+    <NA> if never breached) and breached.
+    """
+
+    library = library if library is not None else load_shock_library()
+    names, paths = shock_paths(library)
+    paths = {key: value[None] for key, value in paths.items()}  # (1, shocks, periods)
+
+    metrics = calculate_portfolio_metrics(portfolio)
+    revenue = np.asarray(portfolio['revenue'], dtype=float)
+    cogs = np.asarray(portfolio['cogs'], dtype=float)
+    liquidity = np.asarray(portfolio['cash'], dtype=float)
+    if 'credit_line' in portfolio:
+        liquidity = liquidity + np.asarray(portfolio['credit_line'], dtype=float)
+    dso, dio, dpo = (metrics[col].to_numpy() for col in ('dso', 'dio', 'dpo'))
+
+    n_entities, n_shocks = len(portfolio), len(names)
+    rate, ocf_margin = (np.broadcast_to(assumption(portfolio, name), n_entities)
+                        for name in ('cost_of_capital', 'ocf_margin'))
+    peak = np.empty((n_entities, n_shocks))
+    peak_period = np.empty((n_entities, n_shocks), dtype=np.int64)
+    first_breach = np.empty((n_entities, n_shocks), dtype=np.int64)
+    any_breach = np.empty((n_entities, n_shocks), dtype=bool)
+
+    for start in range(0, n_entities, chunk_size):
+        block = slice(start, start + chunk_size)
+        requirement, breached = _replay_chunk(
+            revenue[block], cogs[block], dso[block], dio[block], dpo[block], liquidity[block],
+            rate[block], ocf_margin[block], paths,
+        )
+        peak_period[block] = requirement.argmax(axis=2)
+        peak[block] = np.take_along_axis(requirement, peak_period[block][..., None], axis=2)[..., 0]
+        first_breach[block] = breached.argmax(axis=2)
+        any_breach[block] = breached.any(axis=2)
+
+    first_breach_period = pd.array(first_breach.ravel() + 1, dtype='Int64')
+    first_breach_period[~any_breach.ravel()] = pd.NA
+
+    return pd.DataFrame({
+        'entity_id': np.repeat(np.asarray(portfolio.get('entity_id', portfolio.index)), n_shocks),
+        'shock': np.tile(names, n_entities),
+        'peak_requirement': peak.ravel(),
+        'peak_period': peak_period.ravel() + 1,
+        'first_breach_period': first_breach_period,
+        'breached': any_breach.ravel(),
+    })
+
+
+def summarize_replay(results):
+    """Portfolio-level summary per shock"""
+
+    return results.groupby('shock', sort=False).agg(
+        entities=('entity_id', 'size'),
+        breached=('breached', 'sum'),
+        total_peak_requirement=('peak_requirement', 'sum'),
+        max_peak_requirement=('peak_requirement', 'max'),
+        median_first_breach=('first_breach_period', 'median'),
+    ).assign(breach_rate=lambda df: df['breached'] / df['entities'])
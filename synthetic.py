@@ -0,0 +1,83 @@
+"""
+Synthetic portfolio data for the mock ERP (mock_erp.py) and the benchmark
+scripts.
+
+Numbers are generated around the same defaults as the sidebar inputs in
+app.py so both exercise realistic magnitudes.
+"""
+
+import numpy as np
+import pandas as pd
+
+SEGMENTS = ['Manufacturing', 'Retail', 'Services', 'Distribution', 'Technology']
+
+SEGMENT_DAYS = {
+    # segment: (dso, dio, dpo) long-run means
+    'Manufacturing': (65, 70, 50),
+    'Retail': (15, 55, 40),
+    'Services': (70, 10, 35),
+    'Distribution': (45, 40, 45),
+    'Technology': (80, 20, 40),
+}
+
+
+def generate_portfolio(n_entities, seed=42):
+    """Generate a point-in-time portfolio with the nine sidebar inputs per entity"""
+
+    rng = np.random.default_rng(seed)
+    segment = rng.choice(SEGMENTS, size=n_entities)
+    days = np.array([SEGMENT_DAYS[s] for s in SEGMENTS], dtype=float)
+    codes = pd.Categorical(segment, categories=SEGMENTS).codes
+    dso, dio, dpo = (days[codes] * rng.lognormal(0, 0.25, size=(n_entities, 3))).T
+
+    revenue = rng.lognormal(np.log(20_000_000), 1.0, size=n_entities)
+    cogs = revenue * rng.uniform(0.55, 0.85, size=n_entities)
+
+    return pd.DataFrame({
+        'entity_id': np.arange(n_entities),
+        'segment': segment,
+        'revenue': revenue,
+        'cogs': cogs,
+        'cash': revenue * rng.uniform(0.02, 0.15, size=n_entities),
+        'receivables': dso / 365 * revenue,
+        'inventory': dio / 365 * cogs,
+        'other_ca': revenue * rng.uniform(0.0, 0.05, size=n_entities),
+        'payables': dpo / 365 * cogs,
+        'short_debt': revenue * rng.uniform(0.0, 0.12, size=n_entities),
+        'other_cl': revenue * rng.uniform(0.0, 0.04, size=n_entities),
+    })
+
+
+def generate_history(n_entities, n_periods=40, seed=42):
+    """Generate a quarterly DSO/DIO/DPO history per entity (long format)"""
+
+    rng = np.random.default_rng(seed)
+    segment = rng.choice(SEGMENTS, size=n_entities)
+    codes = pd.Categorical(segment, categories=SEGMENTS).codes
+    mean = np.array([SEGMENT_DAYS[s] for s in SEGMENTS], dtype=float)[codes]
+    mean = mean * rng.lognormal(0, 0.2, size=(n_entities, 3))
+
+    # Mean-reverting AR(1) paths with a mild seasonal component
+    days = np.empty((n_entities, n_periods, 3))
+    days[:, 0] = mean * rng.lognormal(0, 0.15, size=(n_entities, 3))
+    season = np.array([4.0, -2.0, -4.0, 2.0])
+    for t in range(1, n_periods):
+        shock = rng.normal(0, 3.0, size=(n_entities, 3))
+        days[:, t] = mean + 0.8 * (days[:, t - 1] - mean) + season[t % 4] + shock
+    days = np.clip(days, 1, None)
+
+    growth = rng.normal(0.02, 0.01, size=n_entities)
+    base_revenue = rng.lognormal(np.log(5_000_000), 1.0, size=n_entities)
+    revenue = base_revenue[:, None] * (1 + growth[:, None]) ** np.arange(n_periods)
+    cogs = revenue * rng.uniform(0.55, 0.85, size=n_entities)[:, None]
+
+    return pd.DataFrame({
+        'entity_id': np.repeat(np.arange(n_entities), n_periods),
+        'period': np.tile(np.arange(n_periods), n_entities),
+        'segment': np.repeat(segment, n_periods),
+        'revenue': revenue.ravel(),
+        'cogs': cogs.ravel(),
+        'dso': days[:, :, 0].ravel(),
+        'dio': days[:, :, 1].ravel(),
+        'dpo': days[:, :, 2].ravel(),
+    })
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def company():
+    """One company with round numbers: DSO 30, DIO 30, DPO 20, CCC 40"""
+
+    return {
+        'revenue': 365_000.0,
+        'cogs': 182_500.0,
+        'cash': 5_000.0,
+        'receivables': 30_000.0,
+        'inventory': 15_000.0,
+        'other_ca': 0.0,
+        'payables': 10_000.0,
+        'short_debt': 0.0,
+        'other_cl': 5_000.0,
+    }
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calc_graph import build_working_capital_graph, what_if_session
+from calculations import calculate_working_capital_metrics
+from portfolio import INPUT_COLUMNS
+
+
+def test_metrics_match_shared_formulas(company):
+    graph = build_working_capital_graph(company)
+
+    assert graph.get('metrics') == calculate_working_capital_metrics(*(company[col] for col in INPUT_COLUMNS))
+    assert graph.get('cycle') == pytest.approx({'dso': 30, 'dio': 30, 'dpo': 20, 'ccc': 40})
+
+
+def test_edit_outside_the_cycle_stops_at_the_cycle(company):
+    graph = build_working_capital_graph(company)
+    for node in ('scenarios', 'cash_flow', 'sensitivity_grid'):
+        graph.get(node)
+
+    graph.update(other_cl=9_000.0)
+    for node in ('metrics', 'scenarios', 'cash_flow', 'sensitivity_grid'):
+        graph.get(node)
+
+    assert graph.recomputed == ['metrics', 'cycle']
+    assert graph.get('metrics')['total_cl'] == 19_000
+
+
+def test_unchanged_input_recomputes_nothing(company):
+    graph = build_working_capital_graph(company)
+    graph.get('scenarios')
+
+    assert graph.update(**company) == []
+    graph.get('scenarios')
+    assert graph.recomputed == []
+
+
+def test_cost_of_capital_reaches_scenarios(company):
+    graph = build_working_capital_graph(company)
+    assert graph.get('scenarios')['Best']['impact'] == pytest.approx(1_000)
+
+    graph.update(cost_of_capital=0.12)
+    assert graph.get('scenarios')['Best']['impact'] == pytest.approx(1_500)
+
+
+def test_cycle_override_replaces_days(company):
+    graph = build_working_capital_graph({**company, 'cycle_override': {'dso': 45.0, 'dio': 30.0, 'dpo': 15.0}})
+
+    assert graph.get('cycle') == {'dso': 45.0, 'dio': 30.0, 'dpo': 15.0, 'ccc': 60.0}
+    assert graph.get('metrics')['current_ratio'] == pytest.approx(10 / 3)
+
+
+def test_learned_path_starts_from_the_displayed_cycle(company):
+    changes = pd.DataFrame({'entity_id': 3, 'horizon': [1, 2], 'dso': [-2.0, -40.0], 'dio': [1.0, 2.0],
+                            'dpo': [0.0, 5.0], 'ccc': [-1.0, -43.0]})
+    graph = build_working_capital_graph(company, figures=True)
+    graph.update(days_forecast=changes)
+
+    path = graph.get('days_path')
+    assert path['dso'].tolist() == [28, 0]      # clipped at zero
+    assert path['ccc'].tolist() == [39, 7]
+    assert graph.get('fig_days_forecast').data[0].y[0] == 30
+
+    graph.update(receivables=60_000.0)
+    assert graph.get('days_path')['dso'].tolist() == [58, 20]
+
+
+def test_sensitivity_heatmap_is_the_grid_node(company):
+    graph = build_working_capital_graph({**company, 'revenue': 365_000_000.0}, figures=True)
+    heatmap = graph.get('fig_sensitivity').data[0]
+
+    assert heatmap.z[0][0] == -4.8      # -30 DSO, -30 DIO at 8%, in millions
+    np.testing.assert_allclose(heatmap.z, np.round(graph.get('sensitivity_grid')[0] / 1_000_000, 2))
+
+    graph.update(receivables=60_000.0)
+    graph.get('fig_sensitivity')
+    assert 'fig_sensitivity' not in graph.recomputed
+
+
+def test_tornado_follows_the_cycle_override(company):
+    graph = build_working_capital_graph(company, figures=True)
+    assert graph.get('tornado').set_index('input').loc['receivables', 'elasticity'] == pytest.approx(30 / 40)
+
+    graph.update(cycle_override={'dso': 45.0, 'dio': 30.0, 'dpo': 15.0})
+    tornado = graph.get('tornado')
+    assert not tornado['derivative'].any()
+    assert tornado.set_index('input').loc['receivables', 'value'] == 30_000
+
+
+def test_what_if_session(company):
+    portfolio = pd.DataFrame([company] * 2).assign(entity_id=[7, 8])
+    results, stats = what_if_session(portfolio, 'receivables', [lambda column: column * 2, 0.0])
+
+    assert len(results) == 4
+    assert results['ccc'].tolist() == pytest.approx([70, 70, 10, 10])
+    assert results['entity_id'].tolist() == [7, 8, 7, 8]
+    assert np.all(stats['recomputed'] > 0)
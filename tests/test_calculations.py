@@ -0,0 +1,74 @@
+import pytest
+
+from calculations import (
+    calculate_cash_flow_impact, calculate_working_capital_metrics, generate_insights, generate_scenario_analysis,
+)
+from portfolio import INPUT_COLUMNS
+
+
+def metrics_for(company):
+    return calculate_working_capital_metrics(*(company[col] for col in INPUT_COLUMNS))
+
+
+def test_metrics_known_values(company):
+    metrics = metrics_for(company)
+
+    assert metrics['total_ca'] == 50_000
+    assert metrics['total_cl'] == 15_000
+    assert metrics['net_wc'] == 35_000
+    assert metrics['current_ratio'] == pytest.approx(10 / 3)
+    assert metrics['dso'] == pytest.approx(30)
+    assert metrics['dio'] == pytest.approx(30)
+    assert metrics['dpo'] == pytest.approx(20)
+    assert metrics['ccc'] == pytest.approx(40)
+
+
+def test_scenarios_and_cash_flow_known_values(company):
+    metrics = metrics_for(company)
+    scenarios = generate_scenario_analysis(metrics, company['revenue'], company['cogs'])
+    cash_flow = calculate_cash_flow_impact(metrics, company['revenue'], company['cogs'])
+
+    # Best: 24 + 25.5 - 22 = 27.5 days, 12.5 days of revenue at 8%
+    assert scenarios['Best']['ccc'] == pytest.approx(27.5)
+    assert scenarios['Best']['impact'] == pytest.approx(1_000)
+    assert scenarios['Worst']['ccc'] == pytest.approx(54)
+    assert scenarios['Worst']['impact'] == pytest.approx(1_120)
+
+    assert cash_flow['net_cash_tied'] == pytest.approx(35_000)
+    assert cash_flow['fcf_impact_pct'] == pytest.approx(35_000 / 54_750 * 100)
+
+
+def test_scenarios_scale_with_cost_of_capital(company):
+    metrics = metrics_for(company)
+    scenarios = generate_scenario_analysis(metrics, company['revenue'], company['cogs'], cost_of_capital=0.12)
+
+    assert scenarios['Best']['impact'] == pytest.approx(1_500)
+
+
+@pytest.mark.parametrize('zeroed', ['revenue', 'inventory'])
+def test_zero_inputs_give_zero_not_errors(company, zeroed):
+    company[zeroed] = 0.0
+    metrics = metrics_for(company)
+    cash_flow = calculate_cash_flow_impact(metrics, company['revenue'], company['cogs'])
+
+    if zeroed == 'revenue':
+        assert metrics['dso'] == 0
+        assert metrics['wc_to_sales'] == 0
+        assert cash_flow['fcf_impact_pct'] == 0
+    else:
+        assert metrics['dio'] == 0
+        assert metrics['inventory_turnover'] == 0
+
+
+def test_insights_flag_liquidity(company):
+    metrics = metrics_for(company)
+    scenarios = generate_scenario_analysis(metrics, company['revenue'], company['cogs'])
+    cash_flow = calculate_cash_flow_impact(metrics, company['revenue'], company['cogs'])
+
+    titles = [insight['title'] for insight in generate_insights(metrics, cash_flow, scenarios)]
+    assert 'Strong Liquidity' in titles
+
+    company['cash'], company['short_debt'] = 0.0, 100_000.0
+    metrics = metrics_for(company)
+    titles = [insight['title'] for insight in generate_insights(metrics, cash_flow, scenarios)]
+    assert 'Critical Liquidity Risk' in titles
@@ -0,0 +1,110 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from erp_connectors import DatabaseERPConnector, RestERPConnector, sync_portfolio
+from mock_erp import MockERPData, create_mock_database, run_mock_server
+from portfolio import INPUT_COLUMNS
+
+N = 20
+
+
+@pytest.fixture
+def data():
+    return MockERPData(N)
+
+
+@pytest.fixture
+def database(data, tmp_path):
+    path = tmp_path / 'erp.sqlite'
+    create_mock_database(data, path)
+    return path
+
+
+def assert_matches(portfolio, data):
+    portfolio = portfolio.set_index('entity_id').sort_index()
+    assert portfolio.index.tolist() == list(range(N))
+    assert portfolio[list(INPUT_COLUMNS)].to_numpy() == pytest.approx(data.portfolio[list(INPUT_COLUMNS)].to_numpy())
+
+
+def test_database_connector(data, database):
+    connector = DatabaseERPConnector(database, pool_size=4)
+    portfolio, open_items, failed = asyncio.run(connector.fetch_entities(list(range(N))))
+
+    assert failed == []
+    assert_matches(portfolio, data)
+    assert len(open_items) == N * 2 * 5
+    assert open_items.groupby(['entity_id', 'type'])['amount'].sum().loc[(3, 'AR')] == pytest.approx(
+        data.portfolio.at[3, 'receivables'])
+
+
+def test_database_connector_retries_a_locked_database(data, database, monkeypatch):
+    locker = sqlite3.connect(database, timeout=0, isolation_level=None, check_same_thread=False)
+    locker.execute("BEGIN EXCLUSIVE")
+    release = threading.Timer(0.2, lambda: locker.execute("COMMIT"))
+    release.start()
+
+    # Fail fast on the lock instead of sqlite's own 5s busy wait, so the connector's retries run
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, 'connect', lambda *args, **kwargs: connect(*args, **{**kwargs, 'timeout': 0}))
+
+    connector = DatabaseERPConnector(database, pool_size=2, retries=8, backoff=0.02)
+    try:
+        portfolio, _, failed = asyncio.run(connector.fetch_entities(list(range(N))))
+    finally:
+        release.join()
+        locker.close()
+
+    assert failed == []
+    assert connector.stats['retries'] > 0
+    assert_matches(portfolio, data)
+
+
+def test_rest_connector_retries_failed_requests(data):
+    async def fetch():
+        async with run_mock_server(data, failure_rate=0.3) as url:
+            connector = RestERPConnector(url, concurrency=8, retries=10, backoff=0.001)
+            return connector, await connector.fetch_entities(list(range(N)))
+
+    connector, (portfolio, open_items, failed) = asyncio.run(fetch())
+
+    assert failed == []
+    assert connector.stats['retries'] > 0
+    assert_matches(portfolio, data)
+    assert len(open_items) == N * 2 * 5
+
+
+def test_incremental_sync_fetches_only_changed_entities(data, tmp_path):
+    async def sync():
+        async with run_mock_server(data) as url:
+            return await sync_portfolio(RestERPConnector(url, include_open_items=False), tmp_path)
+
+    portfolio, first = asyncio.run(sync())
+    assert first['changed'] == N and first['watermark'] is not None
+    assert_matches(portfolio, data)
+
+    _, unchanged = asyncio.run(sync())
+    assert unchanged['changed'] == 0
+
+    data.portfolio.loc[[3, 5], 'cash'] += 1_000
+    data.touch([3, 5])
+    portfolio, touched = asyncio.run(sync())
+    assert (touched['changed'], touched['fetched']) == (2, 2)
+    assert touched['watermark'] > first['watermark']
+    assert_matches(portfolio, data)
+
+
+def test_failed_entities_hold_the_watermark(data, database, tmp_path):
+    with sqlite3.connect(database) as connection:
+        connection.execute("DELETE FROM balances WHERE entity_id = 7")
+
+    portfolio, stats = asyncio.run(sync_portfolio(DatabaseERPConnector(database), tmp_path))
+    assert stats['failed'] == [7]
+    assert stats['watermark'] is None
+    assert len(portfolio) == N - 1
+
+    # The watermark did not advance, so the next sync retries every entity
+    _, again = asyncio.run(sync_portfolio(DatabaseERPConnector(database), tmp_path))
+    assert again['changed'] == N
@@ -0,0 +1,73 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from export import (KEY_TYPES, RESULT_SCHEMAS, SCHEMA_VERSION, compute_result_sets, ipc_stream_bytes,
+                    parquet_bytes, to_arrow_table)
+
+RESULT_SETS = ['portfolio', 'stress', 'sensitivity_grid', 'elasticities']
+
+
+@pytest.fixture
+def portfolio(company):
+    frame = pd.DataFrame([company] * 3)
+    frame['segment'] = pd.Series(['Retail', 'Services', None], dtype='str')
+    return frame
+
+
+@pytest.mark.parametrize('ids', [
+    [101, 102, 103],
+    ['A-1', 'A-2', 'A-3'],
+    [101.0, np.nan, 103.0],
+    pd.Categorical(['A-1', 'A-2', 'A-1']),
+    None,
+])
+def test_entity_keys_have_one_type(portfolio, ids):
+    if ids is not None:
+        portfolio['entity_id'] = ids
+
+    for name, table in compute_result_sets(portfolio, RESULT_SETS).items():
+        assert table.schema.field('entity_id').type == KEY_TYPES['entity_id'], name
+        keys = [key for key in KEY_TYPES if key in table.schema.names]
+        for key in keys:
+            assert table.schema.field(key).type == KEY_TYPES[key], name
+        assert table.schema.names == keys + [field for field, _ in RESULT_SCHEMAS[name]]
+
+
+def test_entity_id_values(portfolio):
+    portfolio['entity_id'] = [101.0, np.nan, 103.0]
+    table = compute_result_sets(portfolio, ['portfolio'])['portfolio']
+    assert table['entity_id'].to_pylist() == ['101', None, '103']
+    assert table['segment'].to_pylist() == ['Retail', 'Services', None]
+
+    grid = compute_result_sets(portfolio.drop(columns='entity_id'), ['sensitivity_grid'])['sensitivity_grid']
+    assert grid['entity_id'].unique().to_pylist() == ['0', '1', '2']
+
+
+def test_non_integer_float_ids_rejected(portfolio):
+    portfolio['entity_id'] = [1.5, 2.0, 3.0]
+    with pytest.raises(ValueError, match='non-integer'):
+        compute_result_sets(portfolio, ['portfolio'])
+
+
+def test_missing_result_columns_rejected():
+    with pytest.raises(ValueError, match='dio, dpo, ccc'):
+        to_arrow_table({'entity_id': [1], 'horizon': [1], 'dso': [30.0]}, 'forecast')
+
+
+def test_round_trip(portfolio):
+    table = compute_result_sets(portfolio, ['portfolio'])['portfolio']
+
+    from_ipc = pa.ipc.open_stream(ipc_stream_bytes(table)).read_all()
+    from_parquet = pq.read_table(io.BytesIO(parquet_bytes(table)))
+
+    for back in (from_ipc, from_parquet):
+        assert back.schema.metadata[b'result_set'] == b'portfolio'
+        assert back.schema.metadata[b'schema_version'] == SCHEMA_VERSION.encode()
+        assert back.schema.field('entity_id').type == KEY_TYPES['entity_id']
+        assert back.schema.field('segment').type == KEY_TYPES['segment']
+        assert back.equals(table)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import (METRICS, WorkingCapitalForecaster, build_panel, evaluate_forecaster, forecast_changes,
+                         quarterly_to_annual_days, rebase_forecast)
+from synthetic import generate_history
+
+
+@pytest.fixture(scope='module')
+def history():
+    return generate_history(60, n_periods=16)
+
+
+@pytest.fixture(scope='module')
+def forecaster(history):
+    return WorkingCapitalForecaster(horizon=4, max_iter=20).fit(history)
+
+
+def test_predict_every_entity_and_horizon(forecaster, history):
+    forecast = forecaster.predict(history)
+
+    assert len(forecast) == 60 * 4
+    assert forecast['horizon'].tolist()[:4] == [1, 2, 3, 4]
+    assert (forecast[list(METRICS)] >= 0).all().all()
+    np.testing.assert_allclose(forecast['ccc'], forecast['dso'] + forecast['dio'] - forecast['dpo'])
+
+
+def test_covers(forecaster, history):
+    assert forecaster.covers(history)
+    assert not forecaster.covers(history.drop(columns='revenue'))
+    assert not forecaster.covers(history.assign(segment='Aerospace'))
+    assert not WorkingCapitalForecaster().covers(history)
+
+
+def test_horizon_is_bounded():
+    with pytest.raises(ValueError, match="horizon"):
+        WorkingCapitalForecaster(horizon=0)
+
+
+def test_quarterly_to_annual_days(forecaster, history):
+    annual = quarterly_to_annual_days(forecaster.predict(history[history['entity_id'] == 0]), years=3)
+
+    # Year 1 is quarter 4; later years hold the last forecast quarter
+    assert all(len(annual[metric]) == 3 for metric in METRICS)
+    assert annual['dso'][0] == annual['dso'][2]
+
+
+def test_changes_rebase_onto_the_last_quarter(forecaster, history):
+    entity = history[history['entity_id'] == 0]
+    forecast = forecaster.predict(entity)
+    changes = forecast_changes(forecast, entity)
+
+    last = entity.loc[entity['period'].idxmax()]
+    rebased = rebase_forecast(changes, last)
+    np.testing.assert_allclose(rebased[['dso', 'dio', 'dpo', 'ccc']], forecast[['dso', 'dio', 'dpo', 'ccc']])
+
+
+def _as_text_quarters(history):
+    """Integer periods 0, 1, ... as "Q1 2020", "Q2 2020", ..., rows shuffled"""
+
+    labels = [f"Q{p % 4 + 1} {2020 + p // 4}" for p in range(history['period'].max() + 1)]
+    text = history.assign(period=np.asarray(labels)[history['period']])
+    return text.sample(frac=1, random_state=0)
+
+
+def test_text_periods_are_ordered_chronologically(forecaster, history):
+    text = _as_text_quarters(history)
+
+    _, periods, _ = build_panel(text)
+    assert periods[:5].tolist() == ['Q1 2020', 'Q2 2020', 'Q3 2020', 'Q4 2020', 'Q1 2021']
+
+    expected = forecaster.predict(history)
+    forecast = forecaster.predict(text)
+    np.testing.assert_allclose(forecast[list(METRICS)], expected[list(METRICS)])
+
+
+def test_evaluation_holds_out_the_latest_text_quarters(history):
+    _, expected, _ = evaluate_forecaster(history, horizon=2, max_iter=10)
+    _, accuracy, _ = evaluate_forecaster(_as_text_quarters(history), horizon=2, max_iter=10)
+
+    assert accuracy['horizon'].unique().tolist() == [1, 2]
+    np.testing.assert_allclose(accuracy[['mae', 'flat_mae']], expected[['mae', 'flat_mae']])
+
+
+def test_duplicate_quarters_raise(history):
+    with pytest.raises(ValueError, match="more than one row"):
+        build_panel(pd.concat([history, history.head(1)]))
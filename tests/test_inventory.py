@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory import load_sku_data, rollup_by_entity
+
+
+def write_files(tmp_path, sku_ids):
+    skus = pd.DataFrame({
+        'entity_id': 0,
+        'sku_id': sku_ids,
+        'unit_cost': 10.0,
+        'lead_time_days': 7.0,
+    })
+    demand = pd.DataFrame({'sku_id': np.repeat(sku_ids, 12), 'demand': 100.0})
+    skus.to_csv(tmp_path / 'skus.csv', index=False)
+    demand.to_csv(tmp_path / 'demand.csv', index=False)
+    return tmp_path / 'skus.csv', tmp_path / 'demand.csv'
+
+
+def test_eoq_known_value(tmp_path):
+    skus, policy = load_sku_data(*write_files(tmp_path, ['A']))
+
+    # Flat demand: 1,200 units a year, no safety stock
+    eoq = np.sqrt(2 * 1_200 * 500 / (0.25 * 10))
+    assert policy.loc[0, 'eoq'] == pytest.approx(eoq)
+    assert policy.loc[0, 'safety_stock'] == pytest.approx(0)
+    assert policy.loc[0, 'target_inventory_value'] == pytest.approx(eoq / 2 * 10)
+
+
+def test_duplicate_sku_ids_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="more than once"):
+        load_sku_data(*write_files(tmp_path, ['A', 'B', 'A']))
+
+
+def test_rollup_with_zero_cogs(tmp_path):
+    _, policy = load_sku_data(*write_files(tmp_path, ['A', 'B']))
+    rollup = rollup_by_entity(policy, inventory=pd.Series({0: 5_000.0}), cogs=pd.Series({0: 0.0}))
+
+    assert rollup.loc[0, 'skus'] == 2
+    assert rollup.loc[0, 'current_dio'] == 0
+    assert rollup.loc[0, 'achievable_dio'] == 0
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel import analyze_panel, infer_freq, latest_trends
+
+
+@pytest.fixture
+def history():
+    """Two entities, 24 months of flat balances and flows, periods as shuffled text"""
+
+    months = pd.period_range('2023-01', periods=24, freq='M')
+    frame = pd.DataFrame({
+        'entity_id': np.repeat([1, 2], 24),
+        'period': np.tile(months.strftime('%b %Y'), 2),
+        'revenue': 1_000.0,
+        'cogs': 500.0,
+        'cash': 100.0,
+        'receivables': 1_200.0,
+        'inventory': 600.0,
+        'other_ca': 0.0,
+        'payables': 300.0,
+        'short_debt': 0.0,
+        'other_cl': 0.0,
+    })
+    return frame.sample(frac=1, random_state=0)
+
+
+def test_string_periods_sort_chronologically(history):
+    panel = analyze_panel(history)
+
+    latest = latest_trends(panel, 1)
+    assert latest['period'] == 'Dec 2024'
+    # Average receivables 1,200 over 12,000 TTM revenue
+    assert latest['dso'] == pytest.approx(36.5)
+    assert latest['dio'] == pytest.approx(36.5)
+    assert latest['dpo'] == pytest.approx(18.25)
+    assert latest['dso_qoq_pct'] == pytest.approx(0)
+
+
+def test_ratios_need_a_full_trailing_year(history):
+    panel = analyze_panel(history)
+
+    # Opening balance plus 12 period-ends: the first 12 months have no DSO
+    assert panel.groupby('entity_id')['dso'].count().tolist() == [12, 12]
+
+
+def test_zero_revenue_gives_nan_days(history):
+    panel = analyze_panel(history.assign(revenue=0.0))
+
+    assert panel['dso'].isna().all()
+    assert panel['dio'].notna().any()
+
+
+def test_unparseable_periods_raise(history):
+    history = history.assign(period=history['period'].where(history['period'] != 'Jun 2024', 'someday'))
+
+    with pytest.raises(ValueError, match="unrecognised periods"):
+        analyze_panel(history)
+
+
+def test_frequency_is_inferred_from_period_spacing(history):
+    assert infer_freq(history) == 'M'
+
+    quarters = pd.period_range('2023Q1', periods=8, freq='Q')
+    quarterly = history.head(16).assign(entity_id=np.repeat([1, 2], 8),
+                                        period=np.tile([f"Q{q.quarter} {q.year}" for q in quarters], 2))
+    assert infer_freq(quarterly) == 'Q'
+    assert analyze_panel(quarterly, freq=infer_freq(quarterly))['dso'].notna().any()
+    assert analyze_panel(quarterly, freq='M')['dso'].isna().all()
+
+    assert infer_freq(history.assign(period=np.arange(len(history)))) is None
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parallel import (
+    parallel_analyze_portfolio, parallel_replay_shocks, parallel_sensitivities, parallel_sensitivity_grid,
+)
+from portfolio import analyze_portfolio, calculate_sensitivity_grid
+from sensitivity import compute_sensitivities
+from stress_testing import replay_shocks
+from synthetic import generate_portfolio
+
+OPTIONS = {'workers': 2, 'min_block_size': 50}
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    portfolio = generate_portfolio(400)
+    portfolio.loc[:4, 'revenue'] = 0.0
+    portfolio.loc[5:9, 'inventory'] = 0.0
+    portfolio['cost_of_capital'] = np.linspace(0.05, 0.15, len(portfolio))
+    return portfolio
+
+
+def test_analyze_portfolio(portfolio):
+    pd.testing.assert_frame_equal(parallel_analyze_portfolio(portfolio, **OPTIONS), analyze_portfolio(portfolio))
+
+
+def test_sensitivity_grid(portfolio):
+    for rate in (0.08, portfolio['cost_of_capital']):
+        np.testing.assert_array_equal(
+            parallel_sensitivity_grid(portfolio['revenue'], cost_of_capital=rate, **OPTIONS),
+            calculate_sensitivity_grid(portfolio['revenue'], cost_of_capital=rate),
+        )
+
+
+def test_sensitivities(portfolio):
+    parallel = parallel_sensitivities(portfolio, **OPTIONS)
+    serial = compute_sensitivities(portfolio)
+
+    assert parallel['outputs'] == serial['outputs']
+    for key in ('values', 'derivatives', 'elasticities'):
+        np.testing.assert_array_equal(parallel[key], serial[key])
+
+
+def test_replay_shocks(portfolio):
+    pd.testing.assert_frame_equal(parallel_replay_shocks(portfolio, **OPTIONS), replay_shocks(portfolio))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from payables import PayablesOptimizer, parse_terms
+
+
+@pytest.mark.parametrize('terms, expected', [
+    ('2/10 net 30', (0.02, 10, 30)),
+    ('2/10, n/30', (0.02, 10, 30)),
+    ('1.5/15 net/45', (0.015, 15, 45)),
+    ('net 60', (0.0, 0, 60)),
+    ('n/30', (0.0, 0, 30)),
+    ('net/30', (0.0, 0, 30)),
+    ('N30', (0.0, 0, 30)),
+])
+def test_parse_terms(terms, expected):
+    parsed = parse_terms([terms]).iloc[0]
+
+    assert tuple(parsed[['discount_pct', 'discount_days', 'net_days']]) == pytest.approx(expected)
+
+
+def test_unrecognised_terms_raise():
+    with pytest.raises(ValueError, match="unrecognised payment terms"):
+        parse_terms(['due on receipt'])
+
+
+def test_blank_terms_raise():
+    with pytest.raises(ValueError, match="no payment terms"):
+        parse_terms(['2/10 net 30', np.nan, 'net 60'])
+
+
+def test_discount_taken_when_implied_rate_beats_cost_of_capital():
+    invoices = pd.DataFrame({
+        'supplier_id': ['s1', 's2'],
+        'amount': [1_000.0, 1_000.0],
+        'terms': ['2/10 n/30', 'n/30'],
+    })
+    optimizer = PayablesOptimizer(invoices)
+
+    # 2% for paying 20 days early
+    assert optimizer.implied_rate[0] == pytest.approx(0.02 / 0.98 * 365 / 20)
+    assert list(optimizer.take_discount(0.08)) == [True, False]
+    assert list(optimizer.take_discount(0.50)) == [False, False]
+
+    summary = optimizer.summary(0.08)
+    assert summary['optimal_dpo'] == pytest.approx(20)
+    assert summary['discounts_captured'] == pytest.approx(20)
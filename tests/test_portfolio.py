@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculations import calculate_working_capital_metrics, generate_scenario_analysis
+from portfolio import INPUT_COLUMNS, analyze_portfolio, calculate_sensitivity_grid
+
+
+@pytest.fixture
+def portfolio(company):
+    frame = pd.DataFrame([company] * 3)
+    frame.insert(0, 'entity_id', [10, 11, 12])
+    frame.loc[1, 'revenue'] = 0.0
+    frame.loc[2, 'inventory'] = 0.0
+    return frame
+
+
+@pytest.mark.filterwarnings('error')
+def test_matches_single_company_formulas(portfolio):
+    result = analyze_portfolio(portfolio)
+
+    for i, row in portfolio.iterrows():
+        metrics = calculate_working_capital_metrics(*(row[col] for col in INPUT_COLUMNS))
+        for key, value in metrics.items():
+            assert result.loc[i, key] == pytest.approx(value), key
+        scenarios = generate_scenario_analysis(metrics, row['revenue'], row['cogs'])
+        assert result.loc[i, 'best_impact'] == pytest.approx(scenarios['Best']['impact'])
+
+    assert list(result['entity_id']) == [10, 11, 12]
+    assert result.loc[1, 'dso'] == 0 and result.loc[1, 'fcf_impact_pct'] == 0
+    assert result.loc[2, 'dio'] == 0
+
+
+def test_per_entity_cost_of_capital(portfolio):
+    base = analyze_portfolio(portfolio)
+    doubled = analyze_portfolio(portfolio.assign(cost_of_capital=0.16))
+
+    np.testing.assert_allclose(doubled['best_impact'], base['best_impact'] * 2)
+
+
+def test_sensitivity_grid_known_value(company):
+    grid = calculate_sensitivity_grid([company['revenue']], [10.0], [-30.0, 0.0])
+
+    assert grid.shape == (1, 2, 1)
+    # 10 fewer/more days of revenue at 8%
+    assert grid[0, 1, 0] == pytest.approx(10 / 365 * 365_000 * 0.08)
+    assert grid[0, 0, 0] == pytest.approx(-20 / 365 * 365_000 * 0.08)
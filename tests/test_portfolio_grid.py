@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_grid import PortfolioGrid, insight_status, style_portfolio_page
+
+
+@pytest.fixture
+def grid():
+    return PortfolioGrid(pd.DataFrame({
+        'entity_id': ['A-1', 'B-2', 'A-3', 'C-4', 'B-5'],
+        'segment': ['Retail', 'Services', 'Retail', 'Manufacturing', 'Services'],
+        'ccc': [40.0, -5.0, 120.0, 75.0, 40.0],
+    }, index=[10, 11, 12, 13, 14]))
+
+
+def test_sort_both_ways(grid):
+    page, total, pages = grid.query('ccc')
+    assert page['entity_id'].tolist() == ['B-2', 'A-1', 'B-5', 'C-4', 'A-3']
+    assert (total, pages) == (5, 1)
+
+    page, _, _ = grid.query('ccc', ascending=False)
+    assert page['ccc'].tolist() == [120, 75, 40, 40, -5]
+
+
+def test_filters_combine(grid):
+    page, total, _ = grid.query('ccc', ranges={'ccc': (0, 100)}, categories={'segment': ['Retail', 'Services']})
+    assert page['entity_id'].tolist() == ['A-1', 'B-5']
+    assert total == 2
+
+    page, total, _ = grid.query(search='a-')
+    assert page['entity_id'].tolist() == ['A-1', 'A-3']
+    assert total == 2
+
+    _, total, pages = grid.query(ranges={'ccc': (500, None)})
+    assert (total, pages) == (0, 1)
+
+
+def test_pages_are_clamped(grid):
+    page, total, pages = grid.query('ccc', page=1, page_size=2)
+    assert page['entity_id'].tolist() == ['B-5', 'C-4']
+    assert (total, pages) == (5, 3)
+
+    last, _, _ = grid.query('ccc', page=99, page_size=2)
+    assert last['entity_id'].tolist() == ['A-3']
+
+
+def test_insight_status_matches_insight_thresholds():
+    assert insight_status('current_ratio', [0.8, 1.2, 2.0]).tolist() == ['danger', 'warning', 'success']
+    assert insight_status('ccc', np.array([-10.0, 40.0, 95.0])).tolist() == ['success', '', 'warning']
+
+
+def test_page_style_keeps_keys_and_colours_status(grid):
+    page, _, _ = grid.query('ccc', ascending=False, page_size=2)
+    html = style_portfolio_page(page.assign(entity_id=[3, 4])).to_html()
+
+    assert '>3<' in html and '>120<' in html
+    assert html.count('background-color') == 1      # CCC of 120 is a warning; 75 has no status
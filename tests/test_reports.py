@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from reports import generate_reports, render_report, report_filename
+
+
+@pytest.fixture
+def portfolio(company):
+    return pd.DataFrame([company] * 4)
+
+
+def test_report_shows_known_values(company):
+    page = render_report({**company, 'entity_id': 7, 'segment': 'Retail'}, as_of='31 Mar 2026')
+
+    assert '<h1>Entity 7</h1>' in page
+    assert 'Retail · 31 Mar 2026' in page
+    assert '40.0 days' in page           # CCC
+    assert '₹1,000' in page              # best case at 8%
+
+
+def test_report_uses_entity_cost_of_capital(company):
+    page = render_report({**company, 'cost_of_capital': 0.12})
+
+    assert '₹1,500' in page
+
+
+def test_missing_segment_is_not_printed(company):
+    page = render_report({**company, 'segment': np.nan})
+
+    assert 'nan' not in page.split('<p class="subtitle">')[1].split('</p>')[0]
+
+
+def test_filename_falls_back_to_row_position():
+    assert report_filename({'entity_id': 12}, 0) == 'entity_12.html'
+    assert report_filename({'entity_id': 12.0}, 0) == 'entity_12.html'
+    assert report_filename({'entity_id': np.nan}, 3) == 'row_3.html'
+    assert report_filename({}, 3) == 'row_3.html'
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_one_file_per_row_without_entity_id(tmp_path, portfolio, workers):
+    stats = generate_reports(portfolio, tmp_path, workers=workers, chunk_size=2)
+
+    assert stats['reports'] == 4
+    assert sorted(path.name for path in tmp_path.glob('*.html')) == [
+        'index.html', 'row_0.html', 'row_1.html', 'row_2.html', 'row_3.html']
+    index = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert all(f'href="row_{i}.html"' in index for i in range(4))
+
+
+def test_duplicate_entity_ids_are_rejected(tmp_path, portfolio):
+    with pytest.raises(ValueError, match="entity_id must be unique"):
+        generate_reports(portfolio.assign(entity_id=[1, 2, 2, 3]), tmp_path, workers=1)
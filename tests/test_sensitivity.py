@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from sensitivity import compute_sensitivities, input_label, sensitivity_table
+
+
+def elasticity(result, output, name):
+    return result['elasticities'][0, result['outputs'].index(output), result['inputs'].index(name)]
+
+
+def test_elasticities_known_values(company):
+    result = compute_sensitivities(company)
+
+    # DSO = receivables / revenue * 365
+    assert elasticity(result, 'dso', 'receivables') == pytest.approx(1)
+    assert elasticity(result, 'dso', 'revenue') == pytest.approx(-1)
+    # CCC = 30 + 30 - 20: receivables drive 30 of its 40 days
+    assert elasticity(result, 'ccc', 'receivables') == pytest.approx(30 / 40)
+    assert elasticity(result, 'best_impact', 'cost_of_capital') == pytest.approx(1)
+
+
+def test_derivatives_match_finite_differences(company):
+    result = compute_sensitivities(company)
+    j = result['inputs'].index('payables')
+    o = result['outputs'].index('current_ratio')
+
+    step = 1.0
+    bumped = compute_sensitivities({**company, 'payables': company['payables'] + step})
+    numeric = (bumped['values'][0, o] - result['values'][0, o]) / step
+    assert result['derivatives'][0, o, j] == pytest.approx(numeric, rel=1e-3)
+
+
+def test_zero_revenue_has_zero_gradient(company):
+    result = compute_sensitivities({**company, 'revenue': 0.0})
+    o = result['outputs'].index('dso')
+
+    assert result['values'][0, o] == 0
+    assert not np.any(result['derivatives'][0, o])
+
+
+def test_tornado_labels_show_the_rate(company):
+    table = sensitivity_table(compute_sensitivities({**company, 'cost_of_capital': 0.12}), 'best_impact')
+
+    assert input_label('cost_of_capital', 0.12) in set(table['label'])
+    assert table['high'].abs().is_monotonic_increasing
+
+
+def test_cycle_override_fixes_the_days(company):
+    result = compute_sensitivities(company, cycle_override={'dso': 45.0, 'dio': 30.0, 'dpo': 15.0})
+    ccc = result['outputs'].index('ccc')
+
+    assert result['values'][0, ccc] == 60
+    assert not np.any(result['derivatives'][0, ccc])
+    assert elasticity(result, 'current_ratio', 'receivables') != 0
+    assert elasticity(result, 'best_impact', 'revenue') == pytest.approx(1)
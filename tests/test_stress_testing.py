@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stress_testing import load_shock_library, replay_shocks
+
+
+@pytest.fixture
+def portfolio(company):
+    return pd.DataFrame([company])
+
+
+def test_builtin_library_loads():
+    library = load_shock_library()
+
+    assert library
+    for shock in library.values():
+        assert len(set(map(len, (shock['dso'], shock['dio'], shock['dpo'], shock['revenue'])))) == 1
+
+
+def test_csv_shock_file(tmp_path):
+    (tmp_path / 'shocks.csv').write_text(
+        "name,period,dso,description\n"
+        "slow_pay,2,1.5,\n"
+        "slow_pay,1,2.0,Customers pay late\n"
+    )
+    library = load_shock_library(tmp_path / 'shocks.csv', builtin=False)
+
+    shock = library['slow_pay']
+    assert shock['dso'] == [2.0, 1.5]                  # sorted by period
+    assert shock['dio'] == [1.0, 1.0]                  # missing multipliers default to 1
+    assert shock['description'] == 'Customers pay late'
+    assert np.isnan(shock['cost_of_capital']).all()    # entity's own rate
+
+
+def test_extra_shocks_merge_over_builtins(tmp_path):
+    builtin = load_shock_library()
+    name = next(iter(builtin))
+    (tmp_path / 'override.json').write_text(json.dumps({'name': name, 'dso': [3.0]}))
+
+    library = load_shock_library(tmp_path / 'override.json')
+    assert library.keys() == builtin.keys()
+    assert library[name]['dso'] == [3.0]
+
+
+def test_shock_without_paths_is_rejected(tmp_path):
+    (tmp_path / 'empty.json').write_text(json.dumps({'name': 'nothing'}))
+
+    with pytest.raises(ValueError, match="has no paths"):
+        load_shock_library(tmp_path / 'empty.json', builtin=False)
+
+
+def test_replay_known_value(portfolio):
+    library = {'double_dso': {'name': 'double_dso', 'description': '', 'dso': [2.0], 'dio': [1.0], 'dpo': [1.0],
+                              'revenue': [1.0], 'cost_of_capital': [np.nan]}}
+    result = replay_shocks(portfolio, library).iloc[0]
+
+    # 30 extra days of receivables, financed for one quarter at 8%
+    assert result['peak_requirement'] == pytest.approx(30_000 + 30_000 * 0.08 / 4)
+    assert result['breached']
+    assert result['first_breach_period'] == 1
+
+
+def test_replay_uses_entity_rate_when_shock_has_none(portfolio):
+    library = {'double_dso': {'name': 'double_dso', 'description': '', 'dso': [2.0], 'dio': [1.0], 'dpo': [1.0],
+                              'revenue': [1.0], 'cost_of_capital': [np.nan]}}
+    result = replay_shocks(portfolio.assign(cost_of_capital=0.16), library).iloc[0]
+
+    assert result['peak_requirement'] == pytest.approx(30_000 + 30_000 * 0.16 / 4)